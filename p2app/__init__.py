@@ -5,8 +5,18 @@
 #
 # Initialization module for the p2app package.
 #
+# The user interface (and with it, tkinter) is only imported once MainView is
+# used, so that the engine can run headless on machines without tkinter.
+#
 # YOU WILL NOT NEED TO MODIFY THIS FILE AT ALL
 
 from .engine import Engine
 from .events import EventBus
-from .views import MainView
+
+
+def __getattr__(name):
+    if name == 'MainView':
+        from .views import MainView
+        return MainView
+
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
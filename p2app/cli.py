@@ -0,0 +1,219 @@
+# p2app/cli.py
+#
+# ICS 33 Winter 2025
+# Project 2: Learning to Fly
+#
+# A headless entry point that drives the engine without the user interface, for
+# scripts, scheduled jobs and servers.  It never imports tkinter.
+#
+# Each command opens a database, sends the engine one event, and prints every event
+# the engine sends back as one line of JSON, so that the output can be piped into
+# other tools.  The exit status is 1 if any of those events reports a failure.
+#
+#     python -m p2app.cli search DATABASE TABLE [--code CODE] [--local-code CODE]
+#                                               [--name NAME] [--page-size N]
+#                                               [--after-id ID]
+#     python -m p2app.cli load DATABASE TABLE ID [ID ...]
+#     python -m p2app.cli save DATABASE TABLE RECORD [--new]
+#     python -m p2app.cli import DATABASE TABLE FILE [--chunk-size N]
+#                                                    [--transaction-size N] [--upsert]
+#     python -m p2app.cli export DATABASE TABLE FILE [--code CODE] [--local-code CODE]
+#                                                    [--name NAME] [--fetch-size N]
+#
+# A saved RECORD is a JSON object whose keys are the table's columns.  Every command
+# also accepts --profile and --snapshot, which open the database the same ways the
+# File menu can.
+
+import argparse
+import json
+import sys
+from collections import namedtuple
+from pathlib import Path
+
+import p2app.events as events
+from p2app.engine import Engine
+
+
+# the record and events that a command on each table uses
+_TableEvents = namedtuple(
+    '_TableEvents', ['record', 'search', 'load', 'save_new', 'save'])
+
+_TABLE_EVENTS = {
+    "continent": _TableEvents(events.Continent, events.StartContinentSearchEvent,
+                              events.LoadContinentsEvent,
+                              events.SaveNewContinentEvent, events.SaveContinentEvent),
+    "country": _TableEvents(events.Country, events.StartCountrySearchEvent,
+                            events.LoadCountriesEvent,
+                            events.SaveNewCountryEvent, events.SaveCountryEvent),
+    "region": _TableEvents(events.Region, events.StartRegionSearchEvent,
+                           events.LoadRegionsEvent,
+                           events.SaveNewRegionEvent, events.SaveRegionEvent)
+}
+
+# the events that report that a command failed
+_FAILURE_EVENTS = (
+    events.ErrorEvent, events.DatabaseOpenFailedEvent, events.SaveContinentFailedEvent,
+    events.SaveCountryFailedEvent, events.SaveRegionFailedEvent, events.ImportFailedEvent,
+    events.ExportFailedEvent
+)
+
+
+def main(arguments: list[str] | None = None) -> int:
+    """Runs the command described by the given command-line arguments, returning the
+    process's exit status."""
+
+    parser = _make_parser()
+    arguments = parser.parse_args(arguments)
+
+    try:
+        event = arguments.command(arguments)
+    except ValueError as e:
+        parser.error(str(e))
+
+    engine = Engine()
+    is_failed = False
+
+    try:
+        for response in engine.process_event(events.OpenDatabaseEvent(
+                arguments.database, arguments.snapshot, arguments.profile)):
+            if isinstance(response, events.DatabaseOpenFailedEvent):
+                _print_event(response)
+                return 1
+
+        try:
+            for response in engine.process_event(event):
+                _print_event(response)
+                is_failed = is_failed or isinstance(response, _FAILURE_EVENTS)
+
+        except Exception as e:
+            _print_event(events.ErrorEvent(f"The engine failed: { e }"))
+            is_failed = True
+
+    finally:
+        engine.close()
+
+    return 1 if is_failed else 0
+
+
+def event_to_json(event) -> dict:
+    """Returns a JSON-compatible dictionary describing the given event: the name of its
+    type, along with the values of its fields."""
+
+    fields = { name.lstrip('_'): _to_json(value) for name, value in vars(event).items() }
+
+    return { "event": type(event).__name__ } | fields
+
+
+def _to_json(value):
+    if hasattr(value, '_asdict'):
+        return { name: _to_json(field) for name, field in value._asdict().items() }
+    elif isinstance(value, (tuple, list)):
+        return [ _to_json(item) for item in value ]
+    elif isinstance(value, dict):
+        return { str(key): _to_json(item) for key, item in value.items() }
+    elif isinstance(value, Path):
+        return str(value)
+    else:
+        return value
+
+
+def _print_event(event) -> None:
+    print(json.dumps(event_to_json(event), ensure_ascii = False), flush = True)
+
+
+def _search_event(arguments: argparse.Namespace, **options):
+    search = _TABLE_EVENTS[arguments.table].search
+
+    if arguments.table == 'region':
+        return search(arguments.code, arguments.local_code, arguments.name, **options)
+    elif arguments.local_code is not None:
+        raise ValueError("--local-code can only be used when searching regions")
+    else:
+        return search(arguments.code, arguments.name, **options)
+
+
+def _search(arguments: argparse.Namespace):
+    return _search_event(arguments, page_size = arguments.page_size,
+                         **{ f"after_{ arguments.table }_id": arguments.after_id })
+
+
+def _load(arguments: argparse.Namespace):
+    return _TABLE_EVENTS[arguments.table].load(arguments.ids)
+
+
+def _save(arguments: argparse.Namespace):
+    table_events = _TABLE_EVENTS[arguments.table]
+
+    try:
+        fields = json.loads(arguments.record)
+    except json.JSONDecodeError:
+        raise ValueError("RECORD must be a JSON object")
+
+    if not isinstance(fields, dict):
+        raise ValueError("RECORD must be a JSON object")
+
+    record = table_events.record(*(fields.get(field) for field in table_events.record._fields))
+
+    return table_events.save_new(record) if arguments.new else table_events.save(record)
+
+
+def _import(arguments: argparse.Namespace):
+    return events.StartImportEvent(
+        arguments.table, arguments.file, arguments.chunk_size, arguments.transaction_size,
+        arguments.upsert)
+
+
+def _export(arguments: argparse.Namespace):
+    return events.StartExportEvent(_search_event(arguments), arguments.file, arguments.fetch_size)
+
+
+def _make_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog = 'python -m p2app.cli')
+    commands = parser.add_subparsers(required = True)
+
+    def add_command(name, command, description):
+        command_parser = commands.add_parser(name, help = description)
+        command_parser.add_argument('database', type = Path)
+        command_parser.add_argument('table', choices = tuple(_TABLE_EVENTS))
+        command_parser.add_argument('--profile', choices = events.PERFORMANCE_PROFILES)
+        command_parser.add_argument('--snapshot', action = 'store_true',
+                                    help = 'serve reads from an in-memory copy')
+        command_parser.set_defaults(command = command)
+        return command_parser
+
+    def add_filters(command_parser):
+        command_parser.add_argument('--code', help = 'the continent, country or region code')
+        command_parser.add_argument('--local-code', help = 'the local code (regions only)')
+        command_parser.add_argument('--name', help = 'part of the name')
+
+    search_parser = add_command('search', _search, 'search for records')
+    add_filters(search_parser)
+    search_parser.add_argument('--page-size', type = int)
+    search_parser.add_argument('--after-id', type = int)
+
+    load_parser = add_command('load', _load, 'load the records with one or more ids')
+    load_parser.add_argument('ids', type = int, nargs = '+')
+
+    save_parser = add_command('save', _save, 'save a record given as a JSON object')
+    save_parser.add_argument('record')
+    save_parser.add_argument('--new', action = 'store_true', help = 'save a new record')
+
+    import_parser = add_command(
+        'import', _import, 'import the records in a CSV or JSONL file into a table')
+    import_parser.add_argument('file', type = Path)
+    import_parser.add_argument('--chunk-size', type = int)
+    import_parser.add_argument('--transaction-size', type = int)
+    import_parser.add_argument('--upsert', action = 'store_true',
+                               help = 'update records whose ids already exist')
+
+    export_parser = add_command(
+        'export', _export, 'export the records a search finds to a CSV or JSONL file')
+    export_parser.add_argument('file', type = Path)
+    add_filters(export_parser)
+    export_parser.add_argument('--fetch-size', type = int)
+
+    return parser
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -5,6 +5,20 @@
 #
 # Initialization module for the p2app.engine package.
 #
+# ThreadedEngine and AsyncEngine are only imported once they're used, so that
+# programs using the engine directly don't pay for importing threading or asyncio.
+#
 # YOU WILL NOT NEED TO MODIFY THIS FILE AT ALL
 
 from .main import Engine
+
+
+def __getattr__(name):
+    if name == 'ThreadedEngine':
+        from .threaded import ThreadedEngine
+        return ThreadedEngine
+    elif name == 'AsyncEngine':
+        from .async_engine import AsyncEngine
+        return AsyncEngine
+
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
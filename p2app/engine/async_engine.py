@@ -0,0 +1,76 @@
+# p2app/engine/async_engine.py
+#
+# ICS 33 Winter 2025
+# Project 2: Learning to Fly
+#
+# An asyncio facade over the engine, for embedding it in a service that handles
+# many requests at once.
+#
+# Every request is processed by the same engine, through the same handlers, on
+# one executor thread that owns the engine's connections.  A request's handler is
+# advanced a few events at a time, each step being a separate job on the executor,
+# so concurrent requests take turns rather than waiting for one another to finish,
+# without needing a thread apiece.
+
+import asyncio
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncGenerator
+
+from .main import Engine
+
+
+# how many events a request's handler produces in one turn on the executor
+_EVENTS_PER_STEP = 64
+
+
+class AsyncEngine:
+    """An engine whose event processing can be awaited from asyncio code."""
+
+    def __init__(self, **engine_options):
+        """Initializes the engine with the given options."""
+        self._engine = Engine(**engine_options)
+        self._executor = ThreadPoolExecutor(max_workers = 1, thread_name_prefix = "engine")
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exception_type, exception, traceback):
+        await self.aclose()
+
+    async def process_event(self, event) -> AsyncGenerator:
+        """An asynchronous generator function that processes one event, yielding the
+        events produced in response as the engine produces them.
+
+        A search stops early, yielding nothing more, once a newer search on the same
+        table is made."""
+
+        loop = asyncio.get_running_loop()
+        self._engine.cancel_older_searches(event)
+        results = self._engine.process_event(event)
+
+        try:
+            while True:
+                step = await loop.run_in_executor(
+                    self._executor, _take, results, _EVENTS_PER_STEP)
+
+                for result in step:
+                    if not self._engine.is_stale(result):
+                        yield result
+
+                if len(step) < _EVENTS_PER_STEP:
+                    return
+
+        finally:
+            await loop.run_in_executor(self._executor, results.close)
+
+    async def aclose(self) -> None:
+        """Closes the connection to the database file, then stops the executor."""
+
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self._engine.close)
+        self._executor.shutdown()
+
+
+def _take(results, count: int) -> list:
+    return list(itertools.islice(results, count))
@@ -0,0 +1,251 @@
+# p2app/engine/bulk.py
+#
+# ICS 33 Winter 2025
+# Project 2: Learning to Fly
+#
+# Streaming bulk import and export of records from and to CSV and JSONL files.
+#
+# Records are read lazily, one line at a time, then validated and inserted in
+# chunks, so the memory an import needs depends on the chunk size rather than on
+# the size of the file.  Each chunk is inserted with a single executemany call,
+# and chunks are grouped into transactions of a bounded size.
+#
+# Exports work the same way in reverse: rows are fetched from the cursor a batch
+# at a time and written out before the next batch is fetched.
+#
+# The csv and json modules are only imported when a file is actually read or
+# written, since the engine imports this module whether or not it's ever used.
+
+import sqlite3
+from collections import namedtuple
+from pathlib import Path
+from typing import Generator, Iterable
+
+
+# how many records are validated and inserted at once, and committed together
+DEFAULT_CHUNK_SIZE = 1000
+DEFAULT_TRANSACTION_SIZE = 50000
+
+# how many rows an export fetches at once, and how often it reports its progress
+DEFAULT_FETCH_SIZE = 1000
+EXPORT_PROGRESS_ROWS = 100000
+
+# how many rejected records an import describes, on top of counting all of them
+MAX_DESCRIBED_REJECTIONS = 20
+
+# the range of integers SQLite can store
+_MIN_INTEGER = -2 ** 63
+_MAX_INTEGER = 2 ** 63 - 1
+
+Column = namedtuple('Column', ['name', 'is_integer', 'is_required', 'is_key'])
+
+# a record read from a file, along with the line it was read from
+SourceRecord = namedtuple('SourceRecord', ['line', 'fields'])
+
+# a record converted into a row of a table, along with the line it was read from
+ValidRow = namedtuple('ValidRow', ['line', 'row'])
+
+Rejection = namedtuple('Rejection', ['line', 'reason'])
+
+
+class FileFormatError(Exception):
+    """Raised when a file can't be read or written as a sequence of records at all."""
+
+
+def read_records(path: Path) -> Generator[SourceRecord]:
+    """Yields the records in the given CSV or JSONL file, each with a dictionary mapping
+    column names to values, reading the file lazily.
+
+    A CSV file's first line names its columns; each line of a JSONL file is one
+    JSON object."""
+
+    suffix = path.suffix.lower()
+
+    if suffix == '.csv':
+        yield from _read_csv(path)
+    elif suffix == '.jsonl':
+        yield from _read_jsonl(path)
+    else:
+        raise FileFormatError(f"Files ending in '{ path.suffix }' can't be imported.")
+
+
+def chunked(items: Iterable, size: int) -> Generator[list]:
+    """Yields lists of up to the given number of consecutive items."""
+
+    chunk = []
+
+    for item in items:
+        chunk.append(item)
+
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+
+    if chunk:
+        yield chunk
+
+
+def table_columns(connection: sqlite3.Connection, table: str) -> tuple[Column, ...]:
+    """Returns the columns of the given table, in order."""
+
+    cursor = connection.execute(f"PRAGMA table_info({ table })")
+    columns = tuple(
+        Column(name, column_type.upper() == 'INTEGER', bool(not_null) and not is_key,
+               bool(is_key))
+        for _, name, column_type, not_null, _, is_key in cursor)
+    cursor.close()
+
+    return columns
+
+
+def insert_statement(table: str, columns: tuple[Column, ...], is_upsert: bool = False) -> str:
+    """Returns the statement inserting one record into the given table, whose
+    parameters are the given columns, in order.
+
+    An upsert updates the existing record with the same key instead of failing, in
+    the same statement."""
+
+    names = ', '.join(column.name for column in columns)
+    placeholders = ', '.join('?' for _ in columns)
+    statement = f"INSERT INTO { table } ({ names }) VALUES ({ placeholders })"
+
+    if is_upsert:
+        keys = ', '.join(column.name for column in columns if column.is_key)
+        updates = ', '.join(
+            f"{ column.name } = excluded.{ column.name }"
+            for column in columns if not column.is_key)
+        statement += f" ON CONFLICT ({ keys }) DO UPDATE SET { updates }"
+
+    return statement
+
+
+def validate_chunk(columns: tuple[Column, ...], records: list[SourceRecord]) \
+        -> tuple[list[ValidRow], list[Rejection]]:
+    """Converts the given records into rows of the given columns, returning the rows
+    that are valid along with a rejection for each record that isn't.
+
+    A record is valid when its required fields are present and every field is text
+    or a number that SQLite can store, with integer columns holding whole numbers
+    only (never booleans, or numbers with fractions), so that no valid row can fail
+    to be bound to the insert statement."""
+
+    rows = []
+    rejections = []
+
+    for record in records:
+        try:
+            row = tuple(_validate_field(column, record.fields) for column in columns)
+            rows.append(ValidRow(record.line, row))
+        except ValueError as e:
+            rejections.append(Rejection(record.line, str(e)))
+
+    return rows, rejections
+
+
+def write_records(path: Path, columns: tuple[str, ...], batches: Iterable[list[tuple]]) \
+        -> Generator[int]:
+    """Writes the given batches of rows, whose values belong to the given columns, to a
+    CSV or JSONL file, yielding the number of rows written so far after each batch.
+
+    Empty values are written as empty CSV fields (or JSON nulls), which is how an
+    import reads them back."""
+
+    suffix = path.suffix.lower()
+
+    if suffix not in ('.csv', '.jsonl'):
+        raise FileFormatError(f"Files ending in '{ path.suffix }' can't be exported.")
+
+    written = 0
+
+    with open(path, 'w', newline = '', encoding = 'utf-8') as file:
+        if suffix == '.csv':
+            import csv
+            writer = csv.writer(file)
+            writer.writerow(columns)
+
+            for rows in batches:
+                writer.writerows(rows)
+                written += len(rows)
+                yield written
+
+        else:
+            import json
+
+            for rows in batches:
+                file.writelines(
+                    json.dumps(dict(zip(columns, row)), ensure_ascii = False) + '\n'
+                    for row in rows)
+                written += len(rows)
+                yield written
+
+
+def fetch_batches(cursor: sqlite3.Cursor, size: int) -> Generator[list[tuple]]:
+    """Yields the rows remaining in the given cursor, up to the given number at a time."""
+
+    while rows := cursor.fetchmany(size):
+        yield rows
+
+
+def _validate_field(column: Column, fields: dict):
+    value = fields.get(column.name)
+
+    if value == '':
+        value = None
+
+    if value is None:
+        if column.is_required:
+            raise ValueError(f"{ column.name } is required.")
+
+        return None
+
+    if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+        raise ValueError(f"{ column.name } must be text or a number.")
+
+    if column.is_integer:
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)
+        elif isinstance(value, str):
+            try:
+                value = int(value)
+            except ValueError:
+                raise ValueError(f"{ column.name } must be an integer.")
+
+        if not isinstance(value, int):
+            raise ValueError(f"{ column.name } must be an integer.")
+
+    if isinstance(value, int) and not _MIN_INTEGER <= value <= _MAX_INTEGER:
+        raise ValueError(f"{ column.name } is too large.")
+
+    return value
+
+
+def _read_csv(path: Path) -> Generator[SourceRecord]:
+    import csv
+
+    with open(path, newline = '', encoding = 'utf-8') as file:
+        reader = csv.DictReader(file)
+
+        if reader.fieldnames is None:
+            return
+
+        for fields in reader:
+            yield SourceRecord(reader.line_num, fields)
+
+
+def _read_jsonl(path: Path) -> Generator[SourceRecord]:
+    import json
+
+    with open(path, encoding = 'utf-8') as file:
+        for line_number, line in enumerate(file, start = 1):
+            if not line.strip():
+                continue
+
+            try:
+                fields = json.loads(line)
+            except json.JSONDecodeError:
+                raise FileFormatError(f"Line { line_number } isn't valid JSON.")
+
+            if not isinstance(fields, dict):
+                raise FileFormatError(f"Line { line_number } isn't a JSON object.")
+
+            yield SourceRecord(line_number, fields)
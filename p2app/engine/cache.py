@@ -0,0 +1,264 @@
+# p2app/engine/cache.py
+#
+# ICS 33 Winter 2025
+# Project 2: Learning to Fly
+#
+# Bounded, least-recently-used caches that keep the engine from asking the
+# database the same question twice.
+#
+# * The record cache holds the records the engine has loaded.  The engine writes
+#   saved records through to it, which keeps it consistent with the database
+#   without ever having to invalidate entries.
+# * The search cache holds the rows found by searches, within a memory budget.
+#   Saving a record invalidates only the searches that record could match.  A
+#   search whose filters narrow a cached search's can be answered by filtering the
+#   cached rows, without asking the database at all.  A search too large for the
+#   budget (such as the first letter or two of a live search on a large table) is
+#   kept as compact columns, within a separate budget, since those are the results
+#   that narrowing saves the most time on.
+
+import sys
+from array import array
+from collections import OrderedDict
+from typing import Iterator
+
+
+class RecordCache:
+    """A cache of records keyed by table and id, which evicts the least recently used
+    record once it holds more than its capacity."""
+
+    def __init__(self, capacity: int):
+        """Initializes an empty cache holding at most the given number of records."""
+        self._capacity = capacity
+        self._records = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, table: str, record_id: int):
+        """Returns the cached record with the given id, or None if it isn't cached."""
+
+        key = (table, record_id)
+
+        if key not in self._records:
+            self._misses += 1
+            return None
+
+        self._hits += 1
+        self._records.move_to_end(key)
+
+        return self._records[key]
+
+    def peek(self, table: str, record_id: int):
+        """Returns the cached record with the given id, or None if it isn't cached,
+        without counting as a use of the cache."""
+
+        return self._records.get((table, record_id))
+
+    def put(self, table: str, record_id: int, record) -> None:
+        """Caches the given record, replacing any record already cached with its id."""
+
+        if self._capacity <= 0:
+            return
+
+        key = (table, record_id)
+
+        self._records[key] = record
+        self._records.move_to_end(key)
+
+        if len(self._records) > self._capacity:
+            self._records.popitem(last = False)
+
+    def clear(self) -> None:
+        """Removes every record from the cache."""
+
+        self._records.clear()
+
+    def statistics(self) -> dict[str, int]:
+        """Returns how often records were found in the cache."""
+
+        return {
+            "record_cache_size": len(self._records),
+            "record_cache_hits": self._hits,
+            "record_cache_misses": self._misses
+        }
+
+
+class SearchCache:
+    """A cache of complete search results keyed by table and normalized filters, which
+    evicts the least recently used results once they take up more than its memory
+    budget.
+
+    Results too large for the budget can instead be kept as compact rows, within a
+    budget of their own, only so that narrower searches can be found in them.
+
+    Saving a record only invalidates the cached searches that the record could have
+    matched, either before or after it was saved."""
+
+    def __init__(self, budget: int, compact_budget: int = 0):
+        """Initializes an empty cache whose results take up at most the given number
+        of bytes, along with at most the given number of bytes of compact results."""
+        self._budget = budget
+        self._results = OrderedDict()
+        self._size = 0
+        self._compact_budget = compact_budget
+        self._compact_results = OrderedDict()
+        self._compact_size = 0
+        self._version = 0
+        self._hits = 0
+        self._misses = 0
+        self._narrowed = 0
+
+    def budget(self) -> int:
+        """Returns the number of bytes the cached results may take up."""
+
+        return self._budget
+
+    def compact_budget(self) -> int:
+        """Returns the number of bytes the compact results may take up."""
+
+        return self._compact_budget
+
+    def version(self) -> int:
+        """Returns a number that changes every time cached results are invalidated, so
+        that results collected across an invalidation are never cached."""
+
+        return self._version
+
+    def get(self, key: tuple):
+        """Returns the cached rows found by the search with the given key, or None if
+        the search isn't cached."""
+
+        if key not in self._results:
+            self._misses += 1
+            return None
+
+        self._hits += 1
+        self._results.move_to_end(key)
+        rows, _, _ = self._results[key]
+
+        return rows
+
+    def put(self, key: tuple, filters: dict[str, str | None], rows: tuple, size: int) -> None:
+        """Caches the rows found by the search with the given key and filters, which are
+        estimated to take up the given number of bytes."""
+
+        if size > self._budget:
+            return
+
+        self._discard(key)
+        self._results[key] = (rows, filters, size)
+        self._size += size
+
+        while self._size > self._budget:
+            _, (_, _, evicted_size) = self._results.popitem(last = False)
+            self._size -= evicted_size
+
+    def put_compact(self, key: tuple, filters: dict[str, str | None], rows: 'CompactRows',
+                    size: int) -> None:
+        """Keeps the compact rows found by the search with the given key and filters,
+        which are estimated to take up the given number of bytes, for narrowing."""
+
+        if size > self._compact_budget:
+            return
+
+        self._discard(key)
+        self._compact_results[key] = (rows, filters, size)
+        self._compact_size += size
+
+        while self._compact_size > self._compact_budget:
+            _, (_, _, evicted_size) = self._compact_results.popitem(last = False)
+            self._compact_size -= evicted_size
+
+    def find_broader(self, table: str, is_broader):
+        """Returns the rows found by the most recently used cached search on the given
+        table that the given function of its key and filters says is broader than the
+        search being made, or None if there's no such search.
+
+        Cached results are preferred to compact ones, which are usually larger."""
+
+        for results in (self._results, self._compact_results):
+            for key, (rows, filters, _) in reversed(results.items()):
+                if key[0] == table and is_broader(key, filters):
+                    self._narrowed += 1
+                    results.move_to_end(key)
+                    return rows
+
+        return None
+
+    def invalidate(self, table: str, could_match) -> None:
+        """Removes the cached searches on the given table whose filters could match a
+        changed record, according to the given function of those filters."""
+
+        self._version += 1
+
+        for results in (self._results, self._compact_results):
+            for key, (_, filters, _) in list(results.items()):
+                if key[0] == table and could_match(filters):
+                    self._discard(key)
+
+    def clear(self) -> None:
+        """Removes every search from the cache."""
+
+        self._version += 1
+        self._results.clear()
+        self._size = 0
+        self._compact_results.clear()
+        self._compact_size = 0
+
+    def statistics(self) -> dict[str, int]:
+        """Returns how often searches were found in the cache."""
+
+        return {
+            "search_cache_entries": len(self._results),
+            "search_cache_bytes": self._size,
+            "search_cache_compact_entries": len(self._compact_results),
+            "search_cache_compact_bytes": self._compact_size,
+            "search_cache_hits": self._hits,
+            "search_cache_misses": self._misses,
+            "search_cache_narrowed": self._narrowed
+        }
+
+    def _discard(self, key: tuple) -> None:
+        if key in self._results:
+            _, _, size = self._results.pop(key)
+            self._size -= size
+
+        if key in self._compact_results:
+            _, _, size = self._compact_results.pop(key)
+            self._compact_size -= size
+
+
+class CompactRows:
+    """Rows whose first value is an integer id, kept as an array of the ids and a list
+    of each of the other columns rather than as a tuple for each row, which saves
+    most of what a row costs beyond its strings."""
+
+    def __init__(self, rows: list[tuple]):
+        """Initializes the compact rows from the given rows, all at once."""
+        columns = list(zip(*rows))
+
+        self._ids = array('q', columns[0] if columns else ())
+        self._columns = tuple(list(column) for column in columns[1:])
+
+    def __len__(self) -> int:
+        """Returns the number of rows."""
+
+        return len(self._ids)
+
+    def __iter__(self) -> Iterator[tuple]:
+        """Yields the rows as tuples again, in their original order."""
+
+        return zip(self._ids, *self._columns)
+
+
+def estimate_row_size(row: tuple) -> int:
+    """Returns a rough estimate of the number of bytes a row takes up in memory."""
+
+    return sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row)
+
+
+def estimate_compact_row_size(row: tuple) -> int:
+    """Returns a rough estimate of the number of bytes a row takes up in memory once
+    it's kept as a compact row."""
+
+    return 8 + sum(8 + sys.getsizeof(value) for value in row[1:])
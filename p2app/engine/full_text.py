@@ -0,0 +1,109 @@
+# p2app/engine/full_text.py
+#
+# ICS 33 Winter 2025
+# Project 2: Learning to Fly
+#
+# Optional full-text indexes over the name columns of the continent, country and
+# region tables, so that name searches don't have to scan the whole table.
+#
+# Each index is an external-content FTS5 table using the trigram tokenizer, which
+# lets SQLite answer "name LIKE '%x%'" from the index while keeping exactly the
+# same substring semantics as the plain LIKE query.  Triggers keep the index in
+# sync with the table it's built on.
+#
+# The trigram tokenizer can only use its index when a pattern has at least three
+# non-wildcard characters in a row; shorter names would make SQLite scan the whole
+# index, and build the complete list of matching rows before returning the first,
+# so they're searched with a plain LIKE instead.
+
+import re
+import sqlite3
+
+
+# the tables whose name column can be indexed, along with their id columns
+INDEXED_TABLES = {
+    "continent": "continent_id",
+    "country": "country_id",
+    "region": "region_id"
+}
+
+# the fewest non-wildcard characters in a row that the trigram tokenizer can look up
+MIN_INDEXED_NAME_LENGTH = 3
+
+
+def full_text_table(table: str) -> str:
+    """Returns the name of the full-text index built on the given table."""
+
+    return f"{ table }_fts"
+
+
+def provision_full_text_index(connection: sqlite3.Connection, table: str) -> bool:
+    """Makes sure the full-text index on the given table exists and is kept in sync
+    by triggers, returning whether the index can be used for name searches.
+
+    The index can't be built when SQLite lacks FTS5 or the trigram tokenizer, or when
+    the database can't be written to; an index built on an earlier visit is still
+    usable in the latter case."""
+
+    if _full_text_table_exists(connection, table):
+        return True
+
+    id_column = INDEXED_TABLES[table]
+    fts = full_text_table(table)
+
+    try:
+        connection.executescript(
+            "BEGIN;"
+            f"CREATE VIRTUAL TABLE { fts } USING fts5("
+            f"    name, content = '{ table }', content_rowid = '{ id_column }',"
+            "     tokenize = 'trigram');"
+            f"CREATE TRIGGER { fts }_insert AFTER INSERT ON { table } BEGIN"
+            f"    INSERT INTO { fts } (rowid, name) VALUES (new.{ id_column }, new.name);"
+            "END;"
+            f"CREATE TRIGGER { fts }_delete AFTER DELETE ON { table } BEGIN"
+            f"    INSERT INTO { fts } ({ fts }, rowid, name)"
+            f"        VALUES ('delete', old.{ id_column }, old.name);"
+            "END;"
+            f"CREATE TRIGGER { fts }_update AFTER UPDATE ON { table } BEGIN"
+            f"    INSERT INTO { fts } ({ fts }, rowid, name)"
+            f"        VALUES ('delete', old.{ id_column }, old.name);"
+            f"    INSERT INTO { fts } (rowid, name) VALUES (new.{ id_column }, new.name);"
+            "END;"
+            f"INSERT INTO { fts } ({ fts }) VALUES ('rebuild');"
+            "COMMIT;")
+
+    except sqlite3.Error:
+        if connection.in_transaction:
+            connection.rollback()
+
+        return False
+
+    return True
+
+
+def is_short_name(name: str) -> bool:
+    """Returns whether the given name is too short for the full-text index to find,
+    having fewer than three non-wildcard characters in a row."""
+
+    return max(map(len, re.split("[%_]", name))) < MIN_INDEXED_NAME_LENGTH
+
+
+def name_condition(table: str, use_full_text_index: bool) -> str:
+    """Returns the SQL condition matching rows of the given table whose name contains
+    the :formatted_name parameter, using the full-text index when asked to."""
+
+    if not use_full_text_index:
+        return "name LIKE :formatted_name"
+
+    return f"{ INDEXED_TABLES[table] } IN (" \
+           f"SELECT rowid FROM { full_text_table(table) } WHERE name LIKE :formatted_name)"
+
+
+def _full_text_table_exists(connection: sqlite3.Connection, table: str) -> bool:
+    cursor = connection.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name",
+        { "name": full_text_table(table) })
+    exists = cursor.fetchone() is not None
+    cursor.close()
+
+    return exists
@@ -0,0 +1,94 @@
+# p2app/engine/indexes.py
+#
+# ICS 33 Winter 2025
+# Project 2: Learning to Fly
+#
+# Makes sure the indexes that the engine's searches rely on exist when a database
+# is opened, so that every search on an exact code (or on a foreign key) is an
+# index seek rather than a scan of the whole table.
+#
+# The indexes on codes also include the code columns and names that a listing of
+# search results selects.  Every index includes a row's id, too, since the ids are
+# the tables' rowids, so listings found by code never have to read the table.
+# Listings found by name with the full-text index still do, one row per match.
+
+import sqlite3
+
+
+# the columns that need an index, in the order their indexes are created
+REQUIRED_INDEXES = (
+    ("continent", ("continent_code", "name")),
+    ("country", ("country_code", "name")),
+    ("country", ("continent_id",)),
+    ("region", ("region_code", "local_code", "name")),
+    ("region", ("local_code", "region_code", "name")),
+    ("region", ("country_id",)),
+    ("region", ("continent_id",))
+)
+
+
+def index_name(table: str, columns: tuple[str, ...]) -> str:
+    """Returns the name given to an index the engine creates on the given columns."""
+
+    return f"{ table }_{ '_'.join(columns) }_index"
+
+
+def provision_indexes(connection: sqlite3.Connection) -> tuple[list[str], list[str]]:
+    """Creates any of the required indexes that the database lacks, then analyzes the
+    database if anything was created or it has never been analyzed.
+
+    Returns the names of the indexes that were created and of the ones that are
+    missing but couldn't be created, such as when the database is read-only."""
+
+    created = []
+    missing = []
+
+    for table, columns in REQUIRED_INDEXES:
+        if _is_indexed(connection, table, columns):
+            continue
+
+        name = index_name(table, columns)
+
+        try:
+            connection.execute(f"CREATE INDEX { name } ON { table } ({ ', '.join(columns) })")
+            created.append(name)
+        except sqlite3.OperationalError:
+            missing.append(name)
+
+    try:
+        if created or not _is_analyzed(connection):
+            connection.execute("ANALYZE")
+
+        connection.commit()
+
+    except sqlite3.OperationalError:
+        connection.rollback()
+
+    return created, missing
+
+
+def _is_indexed(connection: sqlite3.Connection, table: str, columns: tuple[str, ...]) -> bool:
+    cursor = connection.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :table",
+        { "table": table })
+    index_names = [ name for name, in cursor ]
+    cursor.close()
+
+    for name in index_names:
+        cursor = connection.execute(f"PRAGMA index_info('{ name }')")
+        indexed_columns = tuple(column for _, _, column in cursor)
+        cursor.close()
+
+        if indexed_columns[:len(columns)] == columns:
+            return True
+
+    return False
+
+
+def _is_analyzed(connection: sqlite3.Connection) -> bool:
+    cursor = connection.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")
+    is_analyzed = cursor.fetchone() is not None
+    cursor.close()
+
+    return is_analyzed
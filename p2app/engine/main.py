@@ -6,12 +6,72 @@
 # An object that represents the engine of the application.
 
 import sqlite3
-from tkinter.font import names
+import time
+from collections import namedtuple
 from typing import Generator, Union
 
 import p2app.events as events
 from p2app.events import QuitInitiatedEvent, ContinentSavedEvent, SaveContinentFailedEvent
-
+from .bulk import DEFAULT_CHUNK_SIZE, DEFAULT_FETCH_SIZE, DEFAULT_TRANSACTION_SIZE, \
+    EXPORT_PROGRESS_ROWS, MAX_DESCRIBED_REJECTIONS, FileFormatError, Rejection, chunked, \
+    fetch_batches, insert_statement, read_records, table_columns, validate_chunk, write_records
+from .cache import CompactRows, RecordCache, SearchCache, estimate_compact_row_size, \
+    estimate_row_size
+from .full_text import INDEXED_TABLES, provision_full_text_index
+from .indexes import provision_indexes
+from .profiles import PROFILE_PRAGMAS, apply_profile
+from .snapshot import take_snapshot
+from .queries import SEARCH_TABLES, build_search, compile_update, compiled_search_statistics, \
+    could_match, listing_columns, narrows, normalize_filters, row_matcher
+
+
+# the table each kind of search event searches
+_SEARCH_EVENT_TABLES = {
+    events.StartContinentSearchEvent: "continent",
+    events.StartCountrySearchEvent: "country",
+    events.StartRegionSearchEvent: "region"
+}
+
+# the record and events a search on each table produces
+_SearchEvents = namedtuple(
+    '_SearchEvents', ['record', 'result', 'result_batch', 'page_complete', 'result_columns'])
+
+_SEARCH_EVENTS = {
+    "continent": _SearchEvents(events.Continent, events.ContinentSearchResultEvent,
+                               events.ContinentSearchResultBatchEvent,
+                               events.ContinentSearchPageCompleteEvent,
+                               events.ContinentSearchResultColumnsEvent),
+    "country": _SearchEvents(events.Country, events.CountrySearchResultEvent,
+                             events.CountrySearchResultBatchEvent,
+                             events.CountrySearchPageCompleteEvent,
+                             events.CountrySearchResultColumnsEvent),
+    "region": _SearchEvents(events.Region, events.RegionSearchResultEvent,
+                            events.RegionSearchResultBatchEvent,
+                            events.RegionSearchPageCompleteEvent,
+                            events.RegionSearchResultColumnsEvent)
+}
+
+# the table whose search produced each kind of search result event
+_SEARCH_RESULT_TABLES = {
+    result_event: table
+    for table, search_events in _SEARCH_EVENTS.items()
+    for result_event in search_events[1:]
+}
+
+# the optional text columns, which the user interface sends as empty text when
+# they're left blank, but which are stored as NULL
+_OPTIONAL_TEXT_COLUMNS = ("wikipedia_link", "keywords")
+
+# why a save fails when the database can't be written to, such as when it's read-only
+# or locked by another user
+_WRITE_FAILED_REASON = "Failed to write to database."
+
+# how many IDs can be loaded at once with a list of parameters, beyond which they're
+# loaded by joining with a temporary table of IDs instead
+_MAX_LISTED_LOAD_IDS = 500
+
+# how many SQLite virtual machine instructions run between checks for a cancelled search
+_PROGRESS_HANDLER_INSTRUCTIONS = 1000
 
 class Engine:
     """An object that represents the application's engine, whose main role is to
@@ -20,31 +80,72 @@ class Engine:
     unaware of any details of how the engine is implemented.
     """
 
-    def __init__(self):
-        """Initializes the engine"""
+    def __init__(self, use_full_text_index: bool = True, record_cache_size: int = 1000,
+                 search_cache_budget: int = 8 * 1024 * 1024,
+                 compact_search_cache_budget: int = 64 * 1024 * 1024,
+                 group_commit_rows: int | None = None, group_commit_seconds: float = 2.0):
+        """Initializes the engine, optionally backing name searches with full-text
+        indexes built when a database is opened, caching up to the given number of
+        loaded records and up to the given number of bytes of search results.  Listings
+        too large for that budget are kept, up to the compact budget, in compact
+        columns that narrower searches can be found in.
+
+        When a number of group commit rows is given, saved rows are committed together
+        once that many are pending or the oldest has waited the given number of
+        seconds, rather than one at a time."""
         self._connection = None
+        self._disk_connection = None
+        self._snapshot = None
+        self._pragmas = {}
+        self._use_full_text_index = use_full_text_index
+        self._full_text_tables = set()
+        self._record_cache = RecordCache(record_cache_size)
+        self._search_cache = SearchCache(search_cache_budget, compact_search_cache_budget)
+        self._group_commit_rows = group_commit_rows
+        self._group_commit_seconds = group_commit_seconds
+        self._pending_writes = 0
+        self._pending_since = None
+        self._reported_pending_writes = 0
+        self._avoided_writes = 0
+        self._latest_search_generations = {}
+        self._running_search = None
         self._handlers = {
             events.QuitInitiatedEvent: self._handle_quit,
+            events.EngineStatisticsRequestedEvent: self._handle_statistics,
             events.OpenDatabaseEvent: self._handle_open_database,
             events.CloseDatabaseEvent: self._handle_close_database,
+            events.ConfigureGroupCommitEvent: self._handle_configure_group_commit,
+            events.FlushWritesEvent: self._handle_flush_writes,
+            events.StartImportEvent: self._handle_import,
+            events.StartExportEvent: self._handle_export,
             events.StartContinentSearchEvent: self._handle_search_continents,
             events.LoadContinentEvent: self._handle_load_continent,
+            events.LoadContinentsEvent: self._handle_load_continents,
             events.SaveNewContinentEvent: self._handle_save_new_continent,
             events.SaveContinentEvent: self._handle_save_continent,
             events.StartCountrySearchEvent: self._handle_search_countries,
             events.LoadCountryEvent: self._handle_load_country,
+            events.LoadCountriesEvent: self._handle_load_countries,
             events.SaveNewCountryEvent: self._handle_save_new_country,
             events.SaveCountryEvent: self._handle_save_country,
             events.StartRegionSearchEvent: self._handle_search_regions,
             events.LoadRegionEvent: self._handle_load_region,
+            events.LoadRegionsEvent: self._handle_load_regions,
             events.SaveNewRegionEvent: self._handle_save_new_region,
             events.SaveRegionEvent: self._handle_save_region
         }
 
     def __del__(self):
         """Closes the connection to the database file."""
-        if self._connection:
-            self._connection.close()
+        self.close()
+
+    def close(self) -> None:
+        """Closes the connection to the database file, if it's open, and forgets it, so
+        that an engine whose connection was opened on another thread can be closed on
+        that thread and later destroyed on any thread."""
+
+        self._close_connections()
+        self._connection = None
 
     def process_event(self, event):
         """A generator function that processes one event sent from the user interface,
@@ -55,8 +156,560 @@ class Engine:
             yield from ()
             return
 
+        self.cancel_older_searches(event)
+
+        if self._is_group_commit_due():
+            self._flush()
+
         yield from self._handlers[type(event)](event)
 
+        if self._pending_writes != self._reported_pending_writes:
+            yield self._pending_writes_event()
+
+    def cancel_older_searches(self, event) -> None:
+        """Notes that the given event, if it's a search, was made, cancelling any search
+        on the same table with an older generation, including one that's running right
+        now.  This can be called on any thread, so that a newer search can cancel an
+        older one before the engine gets to it."""
+
+        table = _SEARCH_EVENT_TABLES.get(type(event))
+
+        if table is None or event.generation() is None:
+            return
+
+        generation = event.generation()
+
+        if generation > self._latest_search_generations.get(table, 0):
+            self._latest_search_generations[table] = generation
+
+    def is_stale(self, event) -> bool:
+        """Returns whether the given event is the result of a search that a newer search
+        has cancelled, meaning that it shouldn't be shown."""
+
+        table = _SEARCH_RESULT_TABLES.get(type(event))
+
+        return table is not None and self._is_search_cancelled(table, event.generation())
+
+    def _is_search_cancelled(self, table: str, generation: int | None) -> bool:
+        """Returns whether a newer search on the given table has been made than the one
+        with the given generation."""
+
+        return generation is not None \
+            and generation < self._latest_search_generations.get(table, generation)
+
+    def _is_running_search_cancelled(self) -> bool:
+        """The progress handler of the engine's connection, which interrupts SQLite in
+        the middle of a search that has been cancelled."""
+
+        return self._running_search is not None \
+            and self._is_search_cancelled(*self._running_search)
+
+    def _close_connections(self) -> None:
+        """Closes the connection to the database, along with the connection to the
+        database file when a snapshot of it is open."""
+
+        if self._pending_writes:
+            self._flush()
+
+        if self._connection:
+            self._connection.close()
+
+        if self._disk_connection:
+            self._disk_connection.close()
+
+        self._disk_connection = None
+        self._snapshot = None
+        self._pragmas = {}
+
+    def _execute_write(self, cursor: sqlite3.Cursor, query: str, parameters: dict) -> int:
+        """Executes a statement that changes the database, applying it to the database
+        file as well when a snapshot of it is open, and returns the number of rows it
+        changed.  If the file can't be changed, neither is the snapshot."""
+
+        if self._disk_connection:
+            if not self._connection.in_transaction:
+                cursor.execute("BEGIN")
+
+            cursor.execute("SAVEPOINT snapshot_write")
+
+            try:
+                changed = cursor.execute(query, parameters).rowcount
+
+                if changed:
+                    self._disk_connection.execute(query, parameters)
+
+            except sqlite3.Error:
+                cursor.execute("ROLLBACK TO snapshot_write")
+                raise
+
+            finally:
+                cursor.execute("RELEASE snapshot_write")
+
+        else:
+            changed = cursor.execute(query, parameters).rowcount
+
+        if changed == 0:
+            return 0
+
+        if self._pending_writes == 0:
+            self._pending_since = time.monotonic()
+
+        self._pending_writes += 1
+
+        return changed
+
+    def _commit(self) -> None:
+        """Commits the changes made to the database, unless group commit is on and
+        neither of its thresholds has been reached yet."""
+
+        if self._group_commit_rows is None or self._is_group_commit_due():
+            self._flush()
+
+    def _is_group_commit_due(self) -> bool:
+        """Returns whether the pending writes have reached either group commit threshold."""
+
+        if not self._pending_writes or self._group_commit_rows is None:
+            return False
+
+        return self._pending_writes >= self._group_commit_rows \
+            or time.monotonic() - self._pending_since >= self._group_commit_seconds
+
+    def _pending_writes_event(self) -> events.PendingWritesEvent:
+        """Returns an event telling the user interface how many writes are pending."""
+
+        self._reported_pending_writes = self._pending_writes
+        return events.PendingWritesEvent(self._pending_writes)
+
+    def _flush(self) -> None:
+        """Commits the changes made to the database (and to its file, when a snapshot of
+        it is open)."""
+
+        self._connection.commit()
+
+        if self._disk_connection:
+            self._disk_connection.commit()
+
+        self._pending_writes = 0
+        self._pending_since = None
+
+    def _insert_rows(self, cursor: sqlite3.Cursor, statement: str, rows: list) \
+            -> tuple[int, list[Rejection]]:
+        """Inserts the given valid rows with one executemany call, returning how many
+        were inserted along with a rejection for each row the database refused.
+
+        When the database refuses any of the rows, the whole call is rolled back and
+        the rows are inserted one at a time instead, so that one bad row doesn't cost
+        the rest of its chunk."""
+
+        if not self._connection.in_transaction:
+            cursor.execute("BEGIN")
+
+        cursor.execute("SAVEPOINT import_chunk")
+
+        try:
+            cursor.executemany(statement, [ valid.row for valid in rows ])
+            inserted = [ valid.row for valid in rows ]
+            rejections = []
+
+        except sqlite3.IntegrityError:
+            cursor.execute("ROLLBACK TO import_chunk")
+            inserted = []
+            rejections = []
+
+            for valid in rows:
+                try:
+                    cursor.execute(statement, valid.row)
+                    inserted.append(valid.row)
+                except sqlite3.IntegrityError as e:
+                    rejections.append(Rejection(valid.line, str(e)))
+
+        cursor.execute("RELEASE import_chunk")
+
+        if self._disk_connection:
+            self._disk_connection.executemany(statement, inserted)
+
+        return len(inserted), rejections
+
+    def _provision_full_text_indexes(self) -> None:
+        """Builds the full-text indexes on the newly-opened database, keeping track of
+        which tables' name searches can use them."""
+
+        self._full_text_tables = set()
+
+        if not self._use_full_text_index:
+            return
+
+        for table in INDEXED_TABLES:
+            if provision_full_text_index(self._connection, table):
+                self._full_text_tables.add(table)
+
+    @staticmethod
+    def _search_filters(event) -> dict[str, str | None]:
+        """Returns the filters of the given search event, with codes in upper case."""
+
+        def upper(code):
+            return code.upper() if code else None
+
+        if isinstance(event, events.StartContinentSearchEvent):
+            return { "continent_code": upper(event.continent_code()), "name": event.name() }
+        elif isinstance(event, events.StartCountrySearchEvent):
+            return { "country_code": upper(event.country_code()), "name": event.name() }
+        else:
+            return { "region_code": upper(event.region_code()),
+                     "local_code": upper(event.local_code()), "name": event.name() }
+
+    def _search(self, table: str, filters: dict[str, str | None],
+                page_size: int | None = None, after_id: int | None = None,
+                batch_size: int | None = None, generation: int | None = None,
+                is_columnar: bool = False) -> Generator:
+        """Runs the compiled search on the given table with the given filters, yielding
+        its results as records, batches of records or listing columns until cancelled."""
+
+        search_events = _SEARCH_EVENTS[table]
+
+        found = 0
+        last_id = None
+        has_more = False
+        batch = []
+        columns = events.SearchResultColumns()
+
+        for row in self._search_rows(
+                table, filters, page_size, after_id, generation, is_columnar):
+            if self._is_search_cancelled(table, generation):
+                return
+
+            if found == page_size:
+                has_more = True
+                continue
+
+            found += 1
+            last_id = row[0]
+
+            if is_columnar:
+                columns.append(row[0], row[1], row[-1])
+
+                if len(columns) == batch_size:
+                    yield search_events.result_columns(columns, generation)
+                    columns = events.SearchResultColumns()
+
+                continue
+
+            if batch_size is None:
+                yield search_events.result(search_events.record(*row), generation)
+                continue
+
+            batch.append(search_events.record(*row))
+
+            if len(batch) == batch_size:
+                yield search_events.result_batch(tuple(batch), generation)
+                batch = []
+
+        if batch:
+            yield search_events.result_batch(tuple(batch), generation)
+
+        if columns:
+            yield search_events.result_columns(columns, generation)
+
+        if page_size is not None:
+            yield search_events.page_complete(last_id if has_more else None, generation)
+
+    def _search_rows(self, table: str, filters: dict[str, str | None],
+                     page_size: int | None, after_id: int | None,
+                     generation: int | None = None,
+                     is_listing: bool = False) -> Generator[tuple]:
+        """Yields the rows found by a search, from the search cache if it's there,
+        caching them once they've all been yielded if they fit."""
+
+        filters = normalize_filters(table, filters)
+        key = (table, tuple(filters.values()), page_size, after_id, is_listing)
+
+        rows = self._search_cache.get(key)
+
+        if rows is not None:
+            yield from rows
+            return
+
+        if page_size is None and after_id is None:
+            rows = self._narrow(table, filters, is_listing)
+
+            if rows is not None:
+                self._search_cache.put(key, filters, rows, sum(map(estimate_row_size, rows)))
+                yield from rows
+                return
+
+        query, parameters = build_search(
+            table, filters, table in self._full_text_tables, page_size, after_id, is_listing)
+
+        version = self._search_cache.version()
+        collected = []
+        collected_size = 0
+        compact_row_size = None
+        is_compactable = is_listing and page_size is None and after_id is None
+
+        cursor = self._connection.cursor()
+
+        try:
+            self._running_search = (table, generation)
+            cursor.execute(query, parameters)
+
+            while (row := cursor.fetchone()) is not None:
+                self._running_search = None
+                yield row
+
+                if collected is not None:
+                    collected.append(row)
+
+                    if compact_row_size is None:
+                        collected_size += estimate_row_size(row)
+
+                        # past the budget, the rows of a listing are collected to be
+                        # kept as compact rows, whose size is estimated from the rows
+                        # so far, since measuring every row would slow the search down
+                        if collected_size > self._search_cache.budget():
+                            if is_compactable:
+                                compact_row_size = \
+                                    sum(map(estimate_compact_row_size, collected)) / len(collected)
+                            else:
+                                collected = None
+
+                    elif len(collected) * compact_row_size > self._search_cache.compact_budget():
+                        collected = None
+
+                self._running_search = (table, generation)
+
+        except sqlite3.OperationalError:
+            if not self._is_search_cancelled(table, generation):
+                raise
+
+            return
+
+        finally:
+            self._running_search = None
+            cursor.close()
+
+        if collected is None or version != self._search_cache.version():
+            return
+        elif compact_row_size is None:
+            self._search_cache.put(key, filters, tuple(collected), collected_size)
+        else:
+            self._search_cache.put_compact(
+                key, filters, CompactRows(collected), round(len(collected) * compact_row_size))
+
+    def _narrow(self, table: str, filters: dict[str, str | None],
+                is_listing: bool = False) -> tuple | None:
+        """Returns the rows found by a complete search on the given table with the given
+        normalized filters, found by filtering the cached (or compact) rows of a broader
+        complete search selecting the same columns, or None if no such search is
+        cached."""
+
+        def is_broader(key, broader_filters):
+            _, _, page_size, after_id, is_broader_listing = key
+            return page_size is None and after_id is None \
+                and is_broader_listing == is_listing and narrows(table, filters, broader_filters)
+
+        broader_rows = self._search_cache.find_broader(table, is_broader)
+
+        if broader_rows is None:
+            return None
+
+        fields = listing_columns(table) if is_listing else _SEARCH_EVENTS[table].record._fields
+        matches = row_matcher(table, filters, fields)
+
+        return tuple(filter(matches, broader_rows))
+
+    def _load(self, table: str, record_id: int):
+        """Returns the record with the given id from the given table, from the record
+        cache if it's there, or None if no record has that id."""
+
+        record = self._record_cache.get(table, record_id)
+
+        if record is None:
+            id_column = SEARCH_TABLES[table].id_column
+
+            cursor = self._connection.cursor()
+            cursor.execute(f"SELECT * FROM { table } WHERE { id_column } = :id",
+                           { "id": record_id })
+            row = cursor.fetchone()
+            cursor.close()
+
+            if row is None:
+                return None
+
+            record = _SEARCH_EVENTS[table].record(*row)
+            self._record_cache.put(table, record_id, record)
+
+        return record
+
+    def _load_many(self, table: str, record_ids: tuple[int, ...]) -> tuple[tuple, tuple[int, ...]]:
+        """Returns the records with the given ids from the given table, in the order of
+        the ids, along with the ids that no record has, also in order."""
+
+        found = {}
+
+        for record_id in record_ids:
+            record = self._record_cache.get(table, record_id)
+
+            if record is not None:
+                found[record_id] = record
+
+        missing_ids = list(dict.fromkeys(
+            record_id for record_id in record_ids if record_id not in found))
+
+        if missing_ids:
+            record = _SEARCH_EVENTS[table].record
+            id_column = SEARCH_TABLES[table].id_column
+            is_listed = len(missing_ids) <= _MAX_LISTED_LOAD_IDS
+
+            if is_listed:
+                rows = self._select_listed_ids(table, id_column, missing_ids)
+            else:
+                try:
+                    rows = self._select_joined_ids(table, id_column, missing_ids)
+                except sqlite3.OperationalError:
+                    # the temporary table can't be written, such as when queries only
+                    # are allowed, so the ids are listed a few at a time instead
+                    rows = [
+                        row
+                        for chunk_start in range(0, len(missing_ids), _MAX_LISTED_LOAD_IDS)
+                        for row in self._select_listed_ids(
+                            table, id_column,
+                            missing_ids[chunk_start:chunk_start + _MAX_LISTED_LOAD_IDS])
+                    ]
+
+            for row in rows:
+                found[row[0]] = record(*row)
+
+                if is_listed:
+                    self._record_cache.put(table, row[0], found[row[0]])
+
+        records = tuple(found[record_id] for record_id in record_ids if record_id in found)
+        not_found_ids = tuple(record_id for record_id in record_ids if record_id not in found)
+
+        return records, not_found_ids
+
+    def _select_listed_ids(self, table: str, id_column: str, record_ids: list[int]) -> list:
+        """Returns the rows of the given table whose ids are in the given list, found by
+        a query listing them as parameters."""
+
+        placeholders = ", ".join("?" for _ in record_ids)
+
+        cursor = self._connection.execute(
+            f"SELECT * FROM { table } WHERE { id_column } IN ({ placeholders })", record_ids)
+        rows = cursor.fetchall()
+        cursor.close()
+
+        return rows
+
+    def _select_joined_ids(self, table: str, id_column: str, record_ids: list[int]) -> list:
+        """Returns the rows of the given table whose ids are in the given list, found by
+        joining the table with a temporary table of the ids.
+
+        Filling the temporary table starts a transaction, which is committed again
+        (unless one was already open) so that no lock on the database is kept."""
+
+        was_in_transaction = self._connection.in_transaction
+
+        self._connection.execute(
+            "CREATE TEMP TABLE IF NOT EXISTS load_ids (id INTEGER PRIMARY KEY)")
+        self._connection.executemany(
+            "INSERT INTO temp.load_ids (id) VALUES (?)",
+            ((record_id,) for record_id in record_ids))
+
+        try:
+            cursor = self._connection.execute(
+                f"SELECT { table }.* FROM temp.load_ids JOIN { table } "
+                f"ON { table }.{ id_column } = load_ids.id")
+            rows = cursor.fetchall()
+            cursor.close()
+        finally:
+            self._connection.execute("DELETE FROM temp.load_ids")
+
+            if not was_in_transaction:
+                self._connection.commit()
+
+        return rows
+
+    def _update(self, table: str, record) -> bool:
+        """Saves an edited record, returning whether a record with its id exists.
+
+        When the record is in the record cache (as every record served by a load is),
+        only the columns whose values changed are written, and nothing at all is
+        written if none did.  Empty text in an optional text column is the same value
+        as the NULL it's stored as."""
+
+        previous_record = self._record_cache.peek(table, record[0])
+        columns = record._fields[1:]
+
+        if previous_record is not None:
+            unchanged = { column: getattr(previous_record, column) for column in columns
+                          if self._is_same_value(column, getattr(record, column),
+                                            getattr(previous_record, column)) }
+
+            if len(unchanged) == len(columns):
+                self._avoided_writes += 1
+                return True
+
+            columns = tuple(column for column in columns if column not in unchanged)
+            record = record._replace(**unchanged)
+
+        cursor = self._connection.cursor()
+
+        try:
+            updated = self._execute_write(cursor, compile_update(table, columns), record._asdict())
+        finally:
+            cursor.close()
+
+        if updated:
+            self._record_saved(table, record, previous_record)
+
+        return bool(updated)
+
+    @staticmethod
+    def _is_same_value(column: str, value, previous_value) -> bool:
+        """Returns whether saving the given value in the given column would leave its
+        previous value unchanged."""
+
+        if column in _OPTIONAL_TEXT_COLUMNS:
+            return (value or None) == (previous_value or None)
+
+        return value == previous_value
+
+    def _record_saved(self, table: str, record, previous_record = None,
+                      is_new: bool = False) -> None:
+        """Brings the engine's caches up to date after a record is saved, given what the
+        record looked like before, if it existed.
+
+        When an existing record was saved without knowing what it looked like before,
+        every cached search on its table is invalidated, since any of them could have
+        found it."""
+
+        def could_have_matched(filters):
+            if previous_record is None and not is_new:
+                return True
+
+            return could_match(table, filters, record) or \
+                (previous_record is not None and could_match(table, filters, previous_record))
+
+        self._record_cache.put(table, record[0], record)
+        self._search_cache.invalidate(table, could_have_matched)
+
+    def _statistics(self) -> dict[str, int | float | str]:
+        """Returns the engine's internal counters."""
+
+        statistics = compiled_search_statistics() | self._record_cache.statistics() \
+            | self._search_cache.statistics()
+        statistics["pending_writes"] = self._pending_writes
+        statistics["avoided_writes"] = self._avoided_writes
+
+        for pragma, value in self._pragmas.items():
+            statistics[f"pragma_{ pragma }"] = value
+
+        if self._snapshot:
+            statistics["snapshot_size"] = self._snapshot.size
+            statistics["snapshot_seconds"] = self._snapshot.seconds
+
+        return statistics
+
     # event handlers
 
     # application-level events
@@ -64,8 +717,41 @@ class Engine:
             -> Generator[events.EndApplicationEvent]:
         """Quits the application."""
 
+        if self._pending_writes:
+            self._flush()
+            yield self._pending_writes_event()
+
         yield events.EndApplicationEvent()
 
+    def _handle_statistics(self, event: events.EngineStatisticsRequestedEvent) \
+            -> Generator[events.EngineStatisticsEvent]:
+        """Reports the engine's internal counters, for debugging."""
+
+        yield events.EngineStatisticsEvent(self._statistics())
+
+    def _handle_configure_group_commit(self, event: events.ConfigureGroupCommitEvent) \
+            -> Generator:
+        """Turns group commit on or off, committing any pending writes when it's turned
+        off."""
+
+        self._group_commit_rows = event.rows()
+
+        if event.seconds() is not None:
+            self._group_commit_seconds = event.seconds()
+
+        if self._group_commit_rows is None and self._pending_writes:
+            self._flush()
+
+        yield from ()
+
+    def _handle_flush_writes(self, event: events.FlushWritesEvent) -> Generator:
+        """Commits any pending writes right away."""
+
+        if self._pending_writes:
+            self._flush()
+
+        yield from ()
+
     def _handle_open_database(self, event: events.OpenDatabaseEvent) \
             -> Generator[Union[events.DatabaseOpenedEvent, events.DatabaseOpenFailedEvent]]:
         """Opens the connection to the database file."""
@@ -74,9 +760,37 @@ class Engine:
             yield events.DatabaseOpenFailedEvent("Database does not exist.")
             return
 
+        if event.profile() is not None and event.profile() not in PROFILE_PRAGMAS:
+            yield events.DatabaseOpenFailedEvent("Unknown performance profile.")
+            return
+
+        self._close_connections()
+        self._record_cache.clear()
+        self._search_cache.clear()
+
         try:
             self._connection = sqlite3.connect(event.path())
-            yield events.DatabaseOpenedEvent(event.path())
+            pragmas = apply_profile(self._connection, event.profile()) if event.profile() else {}
+            self._pragmas = pragmas
+            _, missing_indexes = provision_indexes(self._connection)
+            self._provision_full_text_indexes()
+
+            if event.is_snapshot():
+                self._disk_connection = self._connection
+                self._snapshot = take_snapshot(self._disk_connection)
+                self._connection = self._snapshot.connection
+
+            self._connection.set_progress_handler(
+                self._is_running_search_cancelled, _PROGRESS_HANDLER_INSTRUCTIONS)
+
+            if self._snapshot:
+                yield events.DatabaseOpenedEvent(
+                    event.path(), tuple(missing_indexes),
+                    self._snapshot.size, self._snapshot.seconds, pragmas)
+            else:
+                yield events.DatabaseOpenedEvent(
+                    event.path(), tuple(missing_indexes), pragmas = pragmas)
+
         except sqlite3.Error as e:
             yield events.DatabaseOpenFailedEvent("Failed to open database.")
 
@@ -84,50 +798,166 @@ class Engine:
             -> Generator[events.DatabaseClosedEvent]:
         """Closes the connection to the database file."""
 
-        self._connection.close()
+        self._close_connections()
+        self._record_cache.clear()
+        self._search_cache.clear()
         yield events.DatabaseClosedEvent()
 
-    def _handle_search_continents(self, event: events.StartContinentSearchEvent) \
-            -> Generator[events.ContinentSearchResultEvent]:
-        """Searches for continents by code and name."""
+    def _handle_import(self, event: events.StartImportEvent) \
+            -> Generator[Union[events.ImportProgressEvent, events.ImportCompletedEvent,
+                               events.ImportFailedEvent]]:
+        """Imports the records in a CSV or JSONL file into a table, reading, validating
+        and inserting them a chunk at a time and committing them in transactions of a
+        bounded size, reporting progress after every transaction.
+
+        An upserting import updates records whose ids already exist rather than
+        rejecting them."""
+
+        table = event.table()
+
+        if table not in SEARCH_TABLES:
+            yield events.ImportFailedEvent("Unknown table.")
+            return
+
+        if not event.path().exists():
+            yield events.ImportFailedEvent("File does not exist.")
+            return
+
+        chunk_size = event.chunk_size() or DEFAULT_CHUNK_SIZE
+        transaction_size = event.transaction_size() or DEFAULT_TRANSACTION_SIZE
+
+        if self._pending_writes:
+            self._flush()
 
+        columns = table_columns(self._connection, table)
+        statement = insert_statement(table, columns, event.is_upsert())
         cursor = self._connection.cursor()
 
-        code = event.continent_code().upper() if event.continent_code() else None
-        name = event.name()
+        start = time.perf_counter()
+        imported = 0
+        rejected = 0
+        uncommitted = 0
+        rejections = []
+        failure = None
 
-        if code and name:
-            cursor.execute(
-                "SELECT * FROM continent"
-                "    WHERE continent_code = :code AND name LIKE :formatted_name",
-                { "code": code, "formatted_name": f"%{ name }%" })
+        try:
+            for records in chunked(read_records(event.path()), chunk_size):
+                rows, invalid = validate_chunk(columns, records)
+                inserted, refused = self._insert_rows(cursor, statement, rows)
 
-        elif code:
-            cursor.execute("SELECT * FROM continent WHERE continent_code = :code",
-                           { "code": code })
+                imported += inserted
+                uncommitted += inserted
+                rejected += len(invalid) + len(refused)
+                rejections.extend(invalid + refused)
+                del rejections[MAX_DESCRIBED_REJECTIONS:]
 
-        elif name:
-            cursor.execute("SELECT * FROM continent WHERE name LIKE :formatted_name",
-                           { "formatted_name": f"%{ name }%" })
+                if uncommitted >= transaction_size:
+                    self._flush()
+                    uncommitted = 0
+                    yield events.ImportProgressEvent(
+                        imported, rejected, time.perf_counter() - start)
 
-        else:
-            cursor.execute("SELECT * FROM continent")
+        except FileFormatError as e:
+            failure = str(e)
 
-        for row in cursor:
-            yield events.ContinentSearchResultEvent(events.Continent(*row))
+        except (OSError, UnicodeDecodeError):
+            failure = "Failed to read file."
+
+        except sqlite3.Error:
+            self._connection.rollback()
+
+            if self._disk_connection:
+                self._disk_connection.rollback()
+
+            imported -= uncommitted
+            failure = "Failed to write to database."
+
+        if self._connection.in_transaction:
+            self._flush()
 
         cursor.close()
 
+        self._record_cache.clear()
+        self._search_cache.clear()
+
+        if failure is not None:
+            yield events.ImportFailedEvent(
+                f"{ failure } { imported } records were imported before the failure.")
+        else:
+            yield events.ImportCompletedEvent(
+                imported, rejected, time.perf_counter() - start,
+                tuple(tuple(rejection) for rejection in sorted(rejections)))
+
+    def _handle_export(self, event: events.StartExportEvent) \
+            -> Generator[Union[events.ExportProgressEvent, events.ExportCompletedEvent,
+                               events.ExportFailedEvent]]:
+        """Exports the rows found by a search to a CSV or JSONL file, streaming them from
+        the cursor a batch at a time so that the rows are never all in memory at once."""
+
+        table = _SEARCH_EVENT_TABLES.get(type(event.search()))
+
+        if table is None:
+            yield events.ExportFailedEvent("Unknown search.")
+            return
+
+        filters = normalize_filters(table, self._search_filters(event.search()))
+        query, parameters = build_search(table, filters, table in self._full_text_tables)
+
+        cursor = self._connection.cursor()
+        start = time.perf_counter()
+        exported = 0
+        reported = 0
+
+        try:
+            cursor.execute(query, parameters)
+            columns = tuple(description[0] for description in cursor.description)
+            batches = fetch_batches(cursor, event.fetch_size() or DEFAULT_FETCH_SIZE)
+
+            for exported in write_records(event.path(), columns, batches):
+                if exported - reported >= EXPORT_PROGRESS_ROWS:
+                    reported = exported
+                    yield events.ExportProgressEvent(exported, time.perf_counter() - start)
+
+        except FileFormatError as e:
+            yield events.ExportFailedEvent(str(e))
+
+        except OSError:
+            yield events.ExportFailedEvent("Failed to write file.")
+
+        except sqlite3.Error:
+            yield events.ExportFailedEvent("Failed to read from database.")
+
+        else:
+            yield events.ExportCompletedEvent(exported, time.perf_counter() - start)
+
+        finally:
+            cursor.close()
+
+    def _handle_search_continents(self, event: events.StartContinentSearchEvent) \
+            -> Generator[events.ContinentSearchResultEvent]:
+        """Searches for continents by code and name."""
+
+        yield from self._search("continent", self._search_filters(event), event.page_size(),
+                                event.after_continent_id(), event.batch_size(),
+                                event.generation(), event.is_columnar())
+
     def _handle_load_continent(self, event: events.LoadContinentEvent) \
-            -> Generator[events.ContinentLoadedEvent]:
+            -> Generator[Union[events.ContinentLoadedEvent, events.ErrorEvent]]:
         """Loads a continent by its ID."""
 
-        cursor = self._connection.cursor()
-        cursor.execute("SELECT * FROM continent WHERE continent_id = :id",
-                       {"id": event.continent_id()})
-        continent = events.Continent(*cursor.fetchone())
+        continent = self._load("continent", event.continent_id())
+
+        if continent is None:
+            yield events.ErrorEvent("Id does not match any continent.")
+            return
+
         yield events.ContinentLoadedEvent(continent)
-        cursor.close()
+
+    def _handle_load_continents(self, event: events.LoadContinentsEvent) \
+            -> Generator[events.ContinentsLoadedEvent]:
+        """Loads any number of continents by their IDs at once."""
+
+        yield events.ContinentsLoadedEvent(*self._load_many("continent", event.continent_ids()))
 
     def _handle_save_new_continent(self, event: events.SaveNewContinentEvent) \
             -> Generator[Union[events.ContinentSavedEvent, events.SaveContinentFailedEvent]]:
@@ -136,7 +966,8 @@ class Engine:
         continent_id, code, name = event.continent()
         cursor = self._connection.cursor()
         try:
-            cursor.execute(
+            self._execute_write(
+                cursor,
                 "INSERT INTO continent (continent_id, continent_code, name)"
                 "   VALUES (:id, :code, :name)",
                 { "id": continent_id, "code": code, "name": name })
@@ -144,79 +975,60 @@ class Engine:
         except sqlite3.IntegrityError:
             yield events.SaveContinentFailedEvent("Continent ID duplicated.")
 
+        except sqlite3.OperationalError:
+            yield events.SaveContinentFailedEvent(_WRITE_FAILED_REASON)
+
         else:
+            self._record_saved("continent", event.continent(), is_new = True)
             yield events.ContinentSavedEvent(event.continent())
 
         finally:
-            self._connection.commit()
+            self._commit()
             cursor.close()
 
     def _handle_save_continent(self, event: events.SaveContinentEvent) \
         -> Generator[Union[ContinentSavedEvent, SaveContinentFailedEvent]]:
         """Edits a continent in the database."""
 
-        continent_id, code, name = event.continent()
-        cursor = self._connection.cursor()
-
-        cursor.execute("SELECT continent_id FROM continent WHERE continent_id = :id",
-                       { "id": continent_id })
+        try:
+            is_updated = self._update("continent", event.continent())
+        except sqlite3.OperationalError:
+            yield events.SaveContinentFailedEvent(_WRITE_FAILED_REASON)
+            return
 
-        if not cursor.fetchone():
+        if not is_updated:
             yield events.SaveContinentFailedEvent("Id does not match any continent.")
             return
 
-        cursor.execute(
-            "UPDATE continent "
-            "   SET continent_code = :code, name = :name"
-            "   WHERE continent_id = :id",
-            { "id": continent_id, "code": code, "name": name })
-
         yield events.ContinentSavedEvent(event.continent())
 
-        self._connection.commit()
-        cursor.close()
+        self._commit()
 
     def _handle_search_countries(self, event: events.StartCountrySearchEvent) \
             -> Generator[events.CountrySearchResultEvent]:
         """Searches for countries by code or name."""
 
-        cursor = self._connection.cursor()
-
-        code = event.country_code().upper() if event.country_code() else None
-        name = event.name()
+        yield from self._search("country", self._search_filters(event), event.page_size(),
+                                event.after_country_id(), event.batch_size(),
+                                event.generation(), event.is_columnar())
 
-        if code and name:
-            cursor.execute(
-                "SELECT * FROM country"
-                "    WHERE country_code = :code AND name LIKE :formatted_name",
-                { "code": code, "formatted_name": f"%{ name }%" })
-
-        elif code:
-            cursor.execute("SELECT * FROM country WHERE country_code = :code",
-                           { "code": code })
+    def _handle_load_country(self, event: events.LoadCountryEvent) \
+            -> Generator[Union[events.CountryLoadedEvent, events.ErrorEvent]]:
+        """Loads a country by its ID."""
 
-        elif name:
-            cursor.execute("SELECT * FROM country WHERE name LIKE :formatted_name",
-                           { "formatted_name": f"%{ name }%" })
+        country = self._load("country", event.country_id())
 
-        else:
-            cursor.execute("SELECT * FROM country")
-
-        for row in cursor:
-            yield events.CountrySearchResultEvent(events.Country(*row))
+        if country is None:
+            yield events.ErrorEvent("Id does not match any country.")
+            return
 
-        cursor.close()
+        yield events.CountryLoadedEvent(country)
 
-    def _handle_load_country(self, event: events.LoadCountryEvent) \
-            -> Generator[events.CountryLoadedEvent]:
-        """Loads a country by its ID."""
+    def _handle_load_countries(self, event: events.LoadCountriesEvent) \
+            -> Generator[events.CountriesLoadedEvent]:
+        """Loads any number of countries by their IDs at once."""
 
-        cursor = self._connection.cursor()
-        cursor.execute("SELECT * FROM country WHERE country_id = :id",
-                       {"id": event.country_id()})
-        country = events.Country(*cursor.fetchone())
-        yield events.CountryLoadedEvent(country)
-        cursor.close()
+        yield events.CountriesLoadedEvent(*self._load_many("country", event.country_ids()))
 
     def _handle_save_new_country(self, event: events.SaveNewCountryEvent) \
             -> Generator[Union[events.CountrySavedEvent, events.SaveCountryFailedEvent]]:
@@ -225,7 +1037,8 @@ class Engine:
         country_id, code, name, continent_id, wikipedia_link, keywords = event.country()
         cursor = self._connection.cursor()
         try:
-            cursor.execute(
+            self._execute_write(
+                cursor,
                 "INSERT INTO country (country_id, country_code, name, continent_id, wikipedia_link,"
                 "                     keywords)"
                 "   VALUES (:id, :code, :name, :continent_id, :wikipedia_link, :keywords)",
@@ -236,109 +1049,60 @@ class Engine:
             print(e)
             yield events.SaveCountryFailedEvent("Country ID duplicated.")
 
+        except sqlite3.OperationalError:
+            yield events.SaveCountryFailedEvent(_WRITE_FAILED_REASON)
+
         else:
+            self._record_saved("country", event.country(), is_new = True)
             yield events.CountrySavedEvent(event.country())
 
         finally:
-            self._connection.commit()
+            self._commit()
             cursor.close()
 
     def _handle_save_country(self, event: events.SaveCountryEvent) \
             -> Generator[Union[events.CountrySavedEvent, events.SaveCountryFailedEvent]]:
         """Edits a country in the database."""
 
-        country_id, code, name, continent_id, wikipedia_link, keywords = event.country()
-        cursor = self._connection.cursor()
+        try:
+            is_updated = self._update("country", event.country())
+        except sqlite3.OperationalError:
+            yield events.SaveCountryFailedEvent(_WRITE_FAILED_REASON)
+            return
 
-        cursor.execute("SELECT country_id FROM country WHERE country_id = :id",
-                       { "id": country_id })
-        if not cursor.fetchone():
+        if not is_updated:
             yield events.SaveCountryFailedEvent("Id does not match any country.")
             return
 
-        cursor.execute(
-            "UPDATE country "
-            "   SET country_code = :code, name = :name, continent_id = :continent_id,"
-            "       wikipedia_link = :wikipedia_link, keywords = :keywords"
-            "   WHERE country_id = :id",
-            { "id": country_id, "code": code, "name": name, "continent_id": continent_id,
-              "wikipedia_link": wikipedia_link, "keywords": keywords })
-
         yield events.CountrySavedEvent(event.country())
 
-        self._connection.commit()
-        cursor.close()
+        self._commit()
 
     def _handle_search_regions(self, event: events.StartRegionSearchEvent) \
             -> Generator[events.RegionSearchResultEvent]:
         """Searches for regions by region code, local code, or name."""
 
-        cursor = self._connection.cursor()
+        yield from self._search("region", self._search_filters(event), event.page_size(),
+                                event.after_region_id(), event.batch_size(),
+                                event.generation(), event.is_columnar())
 
-        region_code = event.region_code().upper() if event.region_code() else None
-        local_code = event.local_code().upper() if event.local_code() else None
-        name = event.name()
-
-        if region_code and local_code and name:
-            cursor.execute(
-                "SELECT * FROM region"
-                "   WHERE region_code = :region_code"
-                "   AND local_code = :local_code"
-                "   AND name LIKE :formatted_name",
-                { "region_code": region_code, "local_code": local_code,
-                  "formatted_name": f"%{ name }%" })
-
-        elif region_code and local_code:
-            cursor.execute(
-                "SELECT * FROM region"
-                "   WHERE region_code = :region_code"
-                "   AND local_code = :local_code",
-                { "region_code": region_code, "local_code": local_code })
-
-        elif region_code and name:
-            cursor.execute(
-                "SELECT * FROM region"
-                "   WHERE region_code = :region_code"
-                "   AND name LIKE :formatted_name",
-                { "region_code": region_code, "formatted_name": f"%{ name }%" })
-
-        elif local_code and name:
-            cursor.execute(
-                "SELECT * FROM region"
-                "   WHERE local_code = :local_code"
-                "   AND name LIKE :formatted_name",
-                { "local_code": local_code, "formatted_name": f"%{ name }%" })
-
-        elif region_code:
-            cursor.execute("SELECT * FROM region WHERE region_code = :region_code",
-                           { "region_code": region_code })
-
-        elif local_code:
-            cursor.execute("SELECT * FROM region WHERE local_code = :local_code",
-                           { "local_code": local_code })
-
-        elif name:
-            cursor.execute("SELECT * FROM region WHERE name LIKE :formatted_name",
-                           { "formatted_name": f"%{ name }%" })
+    def _handle_load_region(self, event: events.LoadRegionEvent) \
+            -> Generator[Union[events.RegionLoadedEvent, events.ErrorEvent]]:
+        """Loads a region by its ID."""
 
-        else:
-            cursor.execute("SELECT * FROM region")
+        region = self._load("region", event.region_id())
 
-        for row in cursor:
-            yield events.RegionSearchResultEvent(events.Region(*row))
+        if region is None:
+            yield events.ErrorEvent("Id does not match any region.")
+            return
 
-        cursor.close()
+        yield events.RegionLoadedEvent(region)
 
-    def _handle_load_region(self, event: events.LoadRegionEvent) \
-            -> Generator[events.RegionLoadedEvent]:
-        """Loads a region by its ID."""
+    def _handle_load_regions(self, event: events.LoadRegionsEvent) \
+            -> Generator[events.RegionsLoadedEvent]:
+        """Loads any number of regions by their IDs at once."""
 
-        cursor = self._connection.cursor()
-        cursor.execute("SELECT * FROM region WHERE region_id = :id",
-                       { "id": event.region_id() })
-        region = events.Region(*cursor.fetchone())
-        yield events.RegionLoadedEvent(region)
-        cursor.close()
+        yield events.RegionsLoadedEvent(*self._load_many("region", event.region_ids()))
 
     def _handle_save_new_region(self, event: events.SaveNewRegionEvent) \
             -> Generator[Union[events.RegionSavedEvent, events.SaveRegionFailedEvent]]:
@@ -348,7 +1112,8 @@ class Engine:
          continent_id, country_id, wikipedia_link, keywords) = event.region()
         cursor = self._connection.cursor()
         try:
-            cursor.execute(
+            self._execute_write(
+                cursor,
                 "INSERT INTO region (region_id, region_code, local_code, name,"
                 "                    continent_id, country_id, wikipedia_link, keywords)"
                 "   VALUES (:id, :region_code, :local_code, :name,"
@@ -360,38 +1125,31 @@ class Engine:
         except sqlite3.IntegrityError:
             yield events.SaveRegionFailedEvent("Region ID duplicated.")
 
+        except sqlite3.OperationalError:
+            yield events.SaveRegionFailedEvent(_WRITE_FAILED_REASON)
+
         else:
+            self._record_saved("region", event.region(), is_new = True)
             yield events.RegionSavedEvent(event.region())
 
         finally:
-            self._connection.commit()
+            self._commit()
             cursor.close()
 
     def _handle_save_region(self, event: events.SaveRegionEvent) \
             -> Generator[Union[events.RegionSavedEvent, events.SaveRegionFailedEvent]]:
         """Edits a region in the database."""
 
-        (region_id, region_code, local_code, name,
-         continent_id, country_id, wikipedia_link, keywords) = event.region()
-        cursor = self._connection.cursor()
+        try:
+            is_updated = self._update("region", event.region())
+        except sqlite3.OperationalError:
+            yield events.SaveRegionFailedEvent(_WRITE_FAILED_REASON)
+            return
 
-        cursor.execute("SELECT region_id FROM region WHERE region_id = :id",
-                       { "id": region_id })
-        if not cursor.fetchone():
+        if not is_updated:
             yield events.SaveRegionFailedEvent("Id does not match any region.")
             return
 
-        cursor.execute(
-            "UPDATE region "
-            "   SET region_code = :region_code, local_code = :local_code, name = :name,"
-            "       continent_id = :continent_id, country_id = :country_id,"
-            "       wikipedia_link = :wikipedia_link, keywords = :keywords"
-            "   WHERE region_id = :id",
-            { "id": region_id, "region_code": region_code, "local_code": local_code,
-              "name": name, "continent_id": continent_id, "country_id": country_id,
-              "wikipedia_link": wikipedia_link, "keywords": keywords })
-
         yield events.RegionSavedEvent(event.region())
 
-        self._connection.commit()
-        cursor.close()
\ No newline at end of file
+        self._commit()
\ No newline at end of file
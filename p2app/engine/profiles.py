@@ -0,0 +1,75 @@
+# p2app/engine/profiles.py
+#
+# ICS 33 Winter 2025
+# Project 2: Learning to Fly
+#
+# Named sets of connection settings (pragmas) that tune SQLite for the different
+# ways the application is used.  Without a profile, a connection keeps sqlite3's
+# defaults.
+#
+# * interactive: write-ahead logging, a larger page cache and memory-mapped reads,
+#   for a local file being browsed and edited through the user interface.
+# * bulk-load: durability traded for speed, for loading large amounts of data
+#   into a file that can be recreated if the load is interrupted.
+# * read-only-share: queries only, no memory mapping (which isn't safe on network
+#   file systems) and a patient busy timeout, for a file shared with other users
+#   over the network.  Nothing is ever written to the file, not even the journal
+#   mode or the indexes the engine would otherwise create when it's opened.
+#
+# A profile's pragmas are applied in order, before the engine does anything else
+# with the connection.
+
+import sqlite3
+
+
+PROFILE_PRAGMAS = {
+    "interactive": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -64 * 1024,
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000
+    },
+    "bulk-load": {
+        "journal_mode": "MEMORY",
+        "synchronous": "OFF",
+        "cache_size": -256 * 1024,
+        "mmap_size": 0,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000
+    },
+    "read-only-share": {
+        "query_only": "ON",
+        "cache_size": -64 * 1024,
+        "mmap_size": 0,
+        "temp_store": "MEMORY",
+        "busy_timeout": 30000
+    }
+}
+
+
+def apply_profile(connection: sqlite3.Connection, profile: str) -> dict[str, int | str]:
+    """Applies the pragmas of the given profile to the given connection, returning the
+    values SQLite actually settled on, which may differ from the ones asked for (for
+    example, an in-memory database can't use write-ahead logging)."""
+
+    pragmas = PROFILE_PRAGMAS[profile]
+
+    for pragma, value in pragmas.items():
+        connection.execute(f"PRAGMA { pragma } = { value }").fetchall()
+
+    return effective_pragmas(connection, pragmas)
+
+
+def effective_pragmas(connection: sqlite3.Connection, pragmas) -> dict[str, int | str]:
+    """Returns the current values of the given pragmas on the given connection."""
+
+    effective = {}
+
+    for pragma in pragmas:
+        cursor = connection.execute(f"PRAGMA { pragma }")
+        effective[pragma], = cursor.fetchone()
+        cursor.close()
+
+    return effective
@@ -0,0 +1,277 @@
+# p2app/engine/queries.py
+#
+# ICS 33 Winter 2025
+# Project 2: Learning to Fly
+#
+# A small compiler for the engine's search queries.
+#
+# A search on any table is described by which of its filters are non-empty, so
+# every combination of filters maps to a bitmask and every bitmask maps to exactly
+# one SQL text.  Compiled texts are memoized, which both skips rebuilding them and
+# guarantees that sqlite3's own statement cache sees identical strings every time.
+#
+# A name too short for the full-text index to look up is searched with a plain LIKE
+# even when the index exists, so whether a search's name is short is part of what
+# its compiled text is keyed by.
+#
+# Searches can also be paged: a page is ordered by id and continues after the last
+# id the previous page returned (keyset pagination), so fetching any page costs the
+# same no matter how far into the results it is.
+#
+# A search that only lists its results selects just the columns a listing shows or
+# filters on (a table's id, code columns and name) rather than whole rows, so that
+# the widest columns are never read for rows that are only listed.  Those columns
+# are all covered by the indexes the engine provisions, so a listing found by code
+# is read entirely from an index.  A listing whose name is found with the full-text
+# index isn't covered: that index only yields the rowids of the matching names, so
+# each match is read from the table with a seek on its id.
+#
+# Edits are compiled the same way, keyed by the columns they change, so that an
+# edit writes only the columns whose values are different.
+
+import functools
+from collections import namedtuple
+from typing import Callable
+
+from .full_text import is_short_name, name_condition
+
+
+SearchTable = namedtuple('SearchTable', ['table', 'id_column', 'code_columns'])
+
+SEARCH_TABLES = {
+    "continent": SearchTable("continent", "continent_id", ("continent_code",)),
+    "country": SearchTable("country", "country_id", ("country_code",)),
+    "region": SearchTable("region", "region_id", ("region_code", "local_code"))
+}
+
+# the filter on the name column, which always comes after a table's code columns
+NAME_FILTER = "name"
+
+# SQLite's LIKE ignores case for ASCII letters only, so names are normalized the same way
+_ASCII_LOWERCASE = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")
+_LIKE_WILDCARDS = ("%", "_")
+
+
+def filter_columns(table: str) -> tuple[str, ...]:
+    """Returns the filters that a search on the given table accepts, in the order
+    their bits appear in a filter mask."""
+
+    return SEARCH_TABLES[table].code_columns + (NAME_FILTER,)
+
+
+def listing_columns(table: str) -> tuple[str, ...]:
+    """Returns the columns that a search on the given table selects when it only lists
+    its results: the table's id, its code columns, and its name, in that order."""
+
+    search_table = SEARCH_TABLES[table]
+
+    return (search_table.id_column,) + search_table.code_columns + (NAME_FILTER,)
+
+
+def normalize_filters(table: str, filters: dict[str, str | None]) -> dict[str, str | None]:
+    """Returns the given filters in their canonical order, with empty filters replaced by
+    None and names folded the way LIKE compares them, so that searches finding the same
+    rows have the same filters."""
+
+    normalized = {}
+
+    for column in filter_columns(table):
+        value = filters.get(column) or None
+
+        if value and column == NAME_FILTER:
+            value = value.translate(_ASCII_LOWERCASE)
+
+        normalized[column] = value
+
+    return normalized
+
+
+def could_match(table: str, filters: dict[str, str | None], record) -> bool:
+    """Returns whether a search on the given table with the given normalized filters
+    could find the given record, erring on the side of yes."""
+
+    return row_matcher(table, filters, record._fields)(record)
+
+
+def row_matcher(table: str, filters: dict[str, str | None], fields: tuple[str, ...]) \
+        -> Callable[[tuple], bool]:
+    """Returns a function telling whether a search on the given table with the given
+    normalized filters could find a row whose values belong to the given fields,
+    erring on the side of yes.  The filters are looked at once, rather than for
+    every row, so that many rows can be matched quickly."""
+
+    checks = []
+
+    for column in filter_columns(table):
+        value = filters.get(column)
+
+        if not value:
+            continue
+        elif column != NAME_FILTER:
+            checks.append((fields.index(column), value, False))
+        elif any(wildcard in value for wildcard in _LIKE_WILDCARDS):
+            checks.append((fields.index(column), None, True))
+        else:
+            checks.append((fields.index(column), value, True))
+
+    def matches(row: tuple) -> bool:
+        for index, value, is_name in checks:
+            field = row[index]
+
+            if field is None:
+                return False
+            elif value is None:
+                continue
+            elif is_name:
+                if not _contains_name(field, value):
+                    return False
+            elif field != value:
+                return False
+
+        return True
+
+    return matches
+
+
+def narrows(table: str, filters: dict[str, str | None],
+            broader_filters: dict[str, str | None]) -> bool:
+    """Returns whether every record a search on the given table with the given
+    normalized filters finds is also found by a search with the broader filters, and
+    could_match can tell exactly which of those records the narrower search finds.
+
+    That's so when every broader filter is either empty or kept by the narrower
+    filters, except that a broader name may be extended by more characters, as long
+    as the narrower name has no wildcards."""
+
+    for column in filter_columns(table):
+        value = filters.get(column)
+        broader_value = broader_filters.get(column)
+
+        if column == NAME_FILTER and value \
+                and any(wildcard in value for wildcard in _LIKE_WILDCARDS):
+            return False
+        elif broader_value is None:
+            continue
+        elif value is None:
+            return False
+        elif column == NAME_FILTER:
+            if broader_value not in value:
+                return False
+        elif value != broader_value:
+            return False
+
+    return True
+
+
+def build_search(table: str, filters: dict[str, str | None], use_full_text_index: bool,
+                 page_size: int | None = None, after_id: int | None = None,
+                 is_listing: bool = False) -> tuple[str, dict[str, str | int]]:
+    """Returns the SQL text and parameters of a search on the given table, skipping any
+    filters that are empty.
+
+    When a page size is given, the query returns one row more than the page size (so
+    the caller can tell whether another page follows), starting after the given id.
+    A listing selects only the table's listing columns, and a name too short for the
+    full-text index is searched without it."""
+
+    filter_mask = 0
+    parameters = {}
+    has_short_name = False
+
+    for bit, column in enumerate(filter_columns(table)):
+        value = filters.get(column)
+
+        if not value:
+            continue
+
+        filter_mask |= 1 << bit
+
+        if column == NAME_FILTER:
+            parameters["formatted_name"] = f"%{ value }%"
+            has_short_name = use_full_text_index and is_short_name(value)
+        else:
+            parameters[column] = value
+
+    if after_id is not None:
+        parameters["after_id"] = after_id
+
+    if page_size is not None:
+        parameters["limit"] = page_size + 1
+
+    query = compile_search(
+        table, filter_mask, use_full_text_index, after_id is not None, page_size is not None,
+        is_listing, has_short_name)
+
+    return query, parameters
+
+
+@functools.lru_cache(maxsize = None)
+def compile_search(table: str, filter_mask: int, use_full_text_index: bool,
+                   is_continued: bool = False, is_paged: bool = False,
+                   is_listing: bool = False, has_short_name: bool = False) -> str:
+    """Returns the one SQL text searching the given table with the filters whose bits
+    are set in the filter mask, optionally continuing after an id, limited to a page
+    of rows, and selecting only the listing columns.  A short name is never searched
+    with the full-text index."""
+
+    id_column = SEARCH_TABLES[table].id_column
+
+    conditions = []
+
+    for bit, column in enumerate(filter_columns(table)):
+        if not filter_mask & (1 << bit):
+            continue
+
+        if column == NAME_FILTER:
+            conditions.append(
+                name_condition(table, use_full_text_index and not has_short_name))
+        else:
+            conditions.append(f"{ column } = :{ column }")
+
+    if is_continued:
+        conditions.append(f"{ id_column } > :after_id")
+
+    selected = ", ".join(listing_columns(table)) if is_listing else "*"
+    query = f"SELECT { selected } FROM { table }"
+
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+
+    if is_paged:
+        query += f" ORDER BY { id_column } LIMIT :limit"
+
+    return query
+
+
+@functools.lru_cache(maxsize = None)
+def compile_update(table: str, columns: tuple[str, ...]) -> str:
+    """Returns the one SQL text updating the given columns of the record of the given
+    table whose id is the parameter named after the table's id column."""
+
+    id_column = SEARCH_TABLES[table].id_column
+    assignments = ", ".join(f"{ column } = :{ column }" for column in columns)
+
+    return f"UPDATE { table } SET { assignments } WHERE { id_column } = :{ id_column }"
+
+
+def compiled_search_statistics() -> dict[str, int | float]:
+    """Returns how often compiled search queries were reused rather than rebuilt."""
+
+    info = compile_search.cache_info()
+    lookups = info.hits + info.misses
+
+    return {
+        "compiled_search_hits": info.hits,
+        "compiled_search_misses": info.misses,
+        "compiled_search_hit_rate": info.hits / lookups if lookups else 0.0
+    }
+
+
+def _contains_name(field: str, name: str) -> bool:
+    # lower() folds ASCII letters the same way LIKE does, and it never loses a match
+    # on a name made of ASCII characters only, so it quickly rules out most fields
+    # before the exact (but slower) fold
+    if name.isascii() and name not in field.lower():
+        return False
+
+    return name in field.translate(_ASCII_LOWERCASE)
@@ -0,0 +1,34 @@
+# p2app/engine/snapshot.py
+#
+# ICS 33 Winter 2025
+# Project 2: Learning to Fly
+#
+# Copies a database file into memory, so that a read-mostly session can serve its
+# searches and loads without any disk I/O (which matters most when the file lives
+# on a slow network share).  The engine keeps the connection to the file open and
+# applies every write to both copies.
+
+import sqlite3
+import time
+from collections import namedtuple
+
+
+Snapshot = namedtuple('Snapshot', ['connection', 'size', 'seconds'])
+
+
+def take_snapshot(disk_connection: sqlite3.Connection) -> Snapshot:
+    """Copies the database behind the given connection into a new in-memory database,
+    returning a connection to it, along with its size in bytes and how many seconds
+    the copy took."""
+
+    start = time.perf_counter()
+
+    memory_connection = sqlite3.connect(":memory:")
+    disk_connection.backup(memory_connection)
+
+    seconds = time.perf_counter() - start
+
+    page_count, = memory_connection.execute("PRAGMA page_count").fetchone()
+    page_size, = memory_connection.execute("PRAGMA page_size").fetchone()
+
+    return Snapshot(memory_connection, page_count * page_size, seconds)
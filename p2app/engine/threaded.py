@@ -0,0 +1,107 @@
+# p2app/engine/threaded.py
+#
+# ICS 33 Winter 2025
+# Project 2: Learning to Fly
+#
+# Runs the engine on a worker thread of its own, so that a slow search or import
+# never blocks the thread running the user interface.
+#
+# Events are put on a queue that the worker consumes one at a time, and the events
+# the engine yields in response are put on a second queue that the user interface
+# drains whenever it's ready to.  Because there's exactly one worker and both
+# queues are first-in, first-out, results come back in the order their requests
+# were made, each request's results in the order the engine yielded them.
+#
+# Only the worker processes events, which means that the engine's connections to
+# the database are only ever used on the thread that opened them, as sqlite3
+# requires.  A search can be cancelled from the user interface's thread, though:
+# submitting a newer search stops an older one that's still running, and the older
+# search's remaining results are dropped rather than handed back.
+
+import queue
+import threading
+from typing import Generator
+
+import p2app.events as events
+from .main import Engine
+
+
+# put on the request queue to tell the worker to close the database and stop
+_STOP = object()
+
+
+class ThreadedEngine:
+    """An engine that processes events on a worker thread, accepting events without
+    waiting for them to be processed and handing back the results later."""
+
+    def __init__(self, **engine_options):
+        """Initializes the engine with the given options, without starting the worker."""
+        self._engine = Engine(**engine_options)
+        self._requests = queue.SimpleQueue()
+        self._results = queue.SimpleQueue()
+        self._worker = threading.Thread(target = self._work, name = "engine", daemon = True)
+
+    def start(self) -> None:
+        """Starts the worker thread."""
+
+        self._worker.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        """Tells the worker to close the database once it has processed every event
+        submitted so far, then waits up to the given number of seconds for it to."""
+
+        if self._worker.is_alive():
+            self._requests.put(_STOP)
+            self._worker.join(timeout)
+
+    def submit(self, event) -> None:
+        """Queues an event for the worker to process, without waiting for it."""
+
+        self._engine.cancel_older_searches(event)
+        self._requests.put((event, None))
+
+    def completed_events(self, limit: int | None = None) -> Generator:
+        """Yields the events the engine has produced since this was last called, up to
+        the given number of them, without waiting for any more, and skipping the results
+        of cancelled searches."""
+
+        delivered = 0
+
+        while limit is None or delivered < limit:
+            try:
+                event = self._results.get_nowait()
+            except queue.Empty:
+                return
+
+            if self._engine.is_stale(event):
+                continue
+
+            delivered += 1
+            yield event
+
+    def process_event(self, event) -> Generator:
+        """A generator function that processes one event on the worker and yields the
+        events produced in response, waiting for them; it's meant for callers (such as
+        tests) that have no event loop of their own, and mustn't be mixed with events
+        submitted without waiting."""
+
+        done = threading.Event()
+        self._requests.put((event, done))
+        done.wait()
+
+        yield from self.completed_events()
+
+    def _work(self) -> None:
+        while (request := self._requests.get()) is not _STOP:
+            event, done = request
+
+            try:
+                for result in self._engine.process_event(event):
+                    self._results.put(result)
+            except Exception as e:
+                self._results.put(events.ErrorEvent(f"The engine failed: { e }"))
+
+            if done is not None:
+                done.set()
+
+        self._engine.close()
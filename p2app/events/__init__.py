@@ -9,7 +9,9 @@
 
 from .event_bus import EventBus
 from .app import *
+from .bulk import *
 from .continents import *
 from .countries import *
 from .database import *
 from .regions import *
+from .results import *
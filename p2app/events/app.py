@@ -35,3 +35,23 @@ class QuitInitiatedEvent:
 class EndApplicationEvent:
     def __repr__(self) -> str:
         return f'{type(self).__name__}'
+
+
+
+class EngineStatisticsRequestedEvent:
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}'
+
+
+
+class EngineStatisticsEvent:
+    def __init__(self, statistics: dict[str, int | float | str]):
+        self._statistics = statistics
+
+
+    def statistics(self) -> dict[str, int | float | str]:
+        return self._statistics
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: statistics = {repr(self._statistics)}'
@@ -0,0 +1,205 @@
+# p2app/events/bulk.py
+#
+# ICS 33 Winter 2025
+# Project 2: Learning to Fly
+#
+# Events related to importing many records into the database at once, or exporting
+# them from it.
+
+from pathlib import Path
+
+
+
+class StartImportEvent:
+    def __init__(self, table: str, path: Path, chunk_size: int | None = None,
+                 transaction_size: int | None = None, is_upsert: bool = False):
+        self._table = table
+        self._path = path
+        self._chunk_size = chunk_size
+        self._transaction_size = transaction_size
+        self._is_upsert = is_upsert
+
+
+    def table(self) -> str:
+        return self._table
+
+
+    def path(self) -> Path:
+        return self._path
+
+
+    def chunk_size(self) -> int | None:
+        return self._chunk_size
+
+
+    def transaction_size(self) -> int | None:
+        return self._transaction_size
+
+
+    def is_upsert(self) -> bool:
+        return self._is_upsert
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: table = {repr(self._table)}, ' + \
+               f'path = {repr(self._path)}, chunk_size = {repr(self._chunk_size)}, ' + \
+               f'transaction_size = {repr(self._transaction_size)}, ' + \
+               f'is_upsert = {repr(self._is_upsert)}'
+
+
+
+class ImportProgressEvent:
+    def __init__(self, imported: int, rejected: int, seconds: float):
+        self._imported = imported
+        self._rejected = rejected
+        self._seconds = seconds
+
+
+    def imported(self) -> int:
+        return self._imported
+
+
+    def rejected(self) -> int:
+        return self._rejected
+
+
+    def seconds(self) -> float:
+        return self._seconds
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: imported = {repr(self._imported)}, ' + \
+               f'rejected = {repr(self._rejected)}, seconds = {repr(self._seconds)}'
+
+
+
+class ImportCompletedEvent:
+    def __init__(self, imported: int, rejected: int, seconds: float,
+                 rejections: tuple[tuple[int, str], ...] = ()):
+        self._imported = imported
+        self._rejected = rejected
+        self._seconds = seconds
+        self._rejections = rejections
+
+
+    def imported(self) -> int:
+        return self._imported
+
+
+    def rejected(self) -> int:
+        return self._rejected
+
+
+    def seconds(self) -> float:
+        return self._seconds
+
+
+    def rows_per_second(self) -> float:
+        return self._imported / self._seconds if self._seconds > 0 else 0.0
+
+
+    def rejections(self) -> tuple[tuple[int, str], ...]:
+        return self._rejections
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: imported = {repr(self._imported)}, ' + \
+               f'rejected = {repr(self._rejected)}, seconds = {repr(self._seconds)}, ' + \
+               f'rejections = {repr(self._rejections)}'
+
+
+
+class ImportFailedEvent:
+    def __init__(self, reason: str):
+        self._reason = reason
+
+
+    def reason(self) -> str:
+        return self._reason
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: reason = {repr(self._reason)}'
+
+
+
+class StartExportEvent:
+    def __init__(self, search, path: Path, fetch_size: int | None = None):
+        self._search = search
+        self._path = path
+        self._fetch_size = fetch_size
+
+
+    def search(self):
+        return self._search
+
+
+    def path(self) -> Path:
+        return self._path
+
+
+    def fetch_size(self) -> int | None:
+        return self._fetch_size
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: search = {repr(self._search)}, ' + \
+               f'path = {repr(self._path)}, fetch_size = {repr(self._fetch_size)}'
+
+
+
+class ExportProgressEvent:
+    def __init__(self, exported: int, seconds: float):
+        self._exported = exported
+        self._seconds = seconds
+
+
+    def exported(self) -> int:
+        return self._exported
+
+
+    def seconds(self) -> float:
+        return self._seconds
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: exported = {repr(self._exported)}, ' + \
+               f'seconds = {repr(self._seconds)}'
+
+
+
+class ExportCompletedEvent:
+    def __init__(self, exported: int, seconds: float):
+        self._exported = exported
+        self._seconds = seconds
+
+
+    def exported(self) -> int:
+        return self._exported
+
+
+    def seconds(self) -> float:
+        return self._seconds
+
+
+    def rows_per_second(self) -> float:
+        return self._exported / self._seconds if self._seconds > 0 else 0.0
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: exported = {repr(self._exported)}, ' + \
+               f'seconds = {repr(self._seconds)}'
+
+
+
+class ExportFailedEvent:
+    def __init__(self, reason: str):
+        self._reason = reason
+
+
+    def reason(self) -> str:
+        return self._reason
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: reason = {repr(self._reason)}'
@@ -12,6 +12,8 @@
 
 from collections import namedtuple
 
+from .results import SearchResultColumns
+
 
 
 Continent = namedtuple('Continent', ['continent_id', 'continent_code', 'name'])
@@ -25,9 +27,17 @@ Continent.__annotations__ = {
 
 
 class StartContinentSearchEvent:
-    def __init__(self, continent_code: str, name: str):
+    def __init__(self, continent_code: str, name: str,
+                 page_size: int | None = None, after_continent_id: int | None = None,
+                 batch_size: int | None = None, generation: int | None = None,
+                 is_columnar: bool = False):
         self._continent_code = continent_code
         self._name = name
+        self._page_size = page_size
+        self._after_continent_id = after_continent_id
+        self._batch_size = batch_size
+        self._generation = generation
+        self._is_columnar = is_columnar
 
 
     def continent_code(self) -> str:
@@ -38,22 +48,117 @@ class StartContinentSearchEvent:
         return self._name
 
 
+    def page_size(self) -> int | None:
+        return self._page_size
+
+
+    def after_continent_id(self) -> int | None:
+        return self._after_continent_id
+
+
+    def batch_size(self) -> int | None:
+        return self._batch_size
+
+
+    def generation(self) -> int | None:
+        return self._generation
+
+
+    def is_columnar(self) -> bool:
+        return self._is_columnar
+
+
     def __repr__(self) -> str:
-        return f'{type(self).__name__}: continent_code = {repr(self._continent_code)}, name = {repr(self._name)}'
+        return f'{type(self).__name__}: continent_code = {repr(self._continent_code)}, ' + \
+               f'name = {repr(self._name)}, page_size = {repr(self._page_size)}, ' + \
+               f'after_continent_id = {repr(self._after_continent_id)}, ' + \
+               f'batch_size = {repr(self._batch_size)}, ' + \
+               f'generation = {repr(self._generation)}, ' + \
+               f'is_columnar = {repr(self._is_columnar)}'
 
 
 
 class ContinentSearchResultEvent:
-    def __init__(self, continent: Continent):
+    def __init__(self, continent: Continent, generation: int | None = None):
         self._continent = continent
+        self._generation = generation
 
 
     def continent(self) -> Continent:
         return self._continent
 
 
+    def generation(self) -> int | None:
+        return self._generation
+
+
     def __repr__(self) -> str:
-        return f'{type(self).__name__}: continent = {repr(self._continent)}'
+        return f'{type(self).__name__}: continent = {repr(self._continent)}, ' + \
+               f'generation = {repr(self._generation)}'
+
+
+
+class ContinentSearchResultBatchEvent:
+    def __init__(self, continents: tuple[Continent, ...], generation: int | None = None):
+        self._continents = continents
+        self._generation = generation
+
+
+    def continents(self) -> tuple[Continent, ...]:
+        return self._continents
+
+
+    def generation(self) -> int | None:
+        return self._generation
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: continents = {repr(self._continents)}, ' + \
+               f'generation = {repr(self._generation)}'
+
+
+
+class ContinentSearchResultColumnsEvent:
+    def __init__(self, columns: SearchResultColumns, generation: int | None = None):
+        self._columns = columns
+        self._generation = generation
+
+
+    def columns(self) -> SearchResultColumns:
+        return self._columns
+
+
+    def generation(self) -> int | None:
+        return self._generation
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: columns = {repr(self._columns)}, ' + \
+               f'generation = {repr(self._generation)}'
+
+
+
+class ContinentSearchPageCompleteEvent:
+    def __init__(self, after_continent_id: int | None, generation: int | None = None):
+        self._after_continent_id = after_continent_id
+        self._generation = generation
+
+
+    def after_continent_id(self) -> int | None:
+        return self._after_continent_id
+
+
+    def has_more(self) -> bool:
+        return self._after_continent_id is not None
+
+
+    def generation(self) -> int | None:
+        return self._generation
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: after_continent_id = {repr(self._after_continent_id)}, ' + \
+               f'generation = {repr(self._generation)}'
 
 
 
@@ -85,6 +190,40 @@ class ContinentLoadedEvent:
 
 
 
+class LoadContinentsEvent:
+    def __init__(self, continent_ids: tuple[int, ...]):
+        self._continent_ids = tuple(continent_ids)
+
+
+    def continent_ids(self) -> tuple[int, ...]:
+        return self._continent_ids
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: continent_ids = {repr(self._continent_ids)}'
+
+
+
+class ContinentsLoadedEvent:
+    def __init__(self, continents: tuple[Continent, ...], not_found_ids: tuple[int, ...] = ()):
+        self._continents = continents
+        self._not_found_ids = not_found_ids
+
+
+    def continents(self) -> tuple[Continent, ...]:
+        return self._continents
+
+
+    def not_found_ids(self) -> tuple[int, ...]:
+        return self._not_found_ids
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: continents = {repr(self._continents)}, ' + \
+               f'not_found_ids = {repr(self._not_found_ids)}'
+
+
+
 class SaveNewContinentEvent:
     def __init__(self, continent: Continent):
         self._continent = continent
@@ -12,6 +12,8 @@
 
 from collections import namedtuple
 
+from .results import SearchResultColumns
+
 
 
 Country = namedtuple(
@@ -30,9 +32,17 @@ Country.__annotations__ = {
 
 
 class StartCountrySearchEvent:
-    def __init__(self, country_code: str, name: str):
+    def __init__(self, country_code: str, name: str,
+                 page_size: int | None = None, after_country_id: int | None = None,
+                 batch_size: int | None = None, generation: int | None = None,
+                 is_columnar: bool = False):
         self._country_code = country_code
         self._name = name
+        self._page_size = page_size
+        self._after_country_id = after_country_id
+        self._batch_size = batch_size
+        self._generation = generation
+        self._is_columnar = is_columnar
 
 
     def country_code(self) -> str:
@@ -43,22 +53,117 @@ class StartCountrySearchEvent:
         return self._name
 
 
+    def page_size(self) -> int | None:
+        return self._page_size
+
+
+    def after_country_id(self) -> int | None:
+        return self._after_country_id
+
+
+    def batch_size(self) -> int | None:
+        return self._batch_size
+
+
+    def generation(self) -> int | None:
+        return self._generation
+
+
+    def is_columnar(self) -> bool:
+        return self._is_columnar
+
+
     def __repr__(self) -> str:
-        return f'{type(self).__name__}: country_code = {repr(self._country_code)}, name = {repr(self._name)}'
+        return f'{type(self).__name__}: country_code = {repr(self._country_code)}, ' + \
+               f'name = {repr(self._name)}, page_size = {repr(self._page_size)}, ' + \
+               f'after_country_id = {repr(self._after_country_id)}, ' + \
+               f'batch_size = {repr(self._batch_size)}, ' + \
+               f'generation = {repr(self._generation)}, ' + \
+               f'is_columnar = {repr(self._is_columnar)}'
 
 
 
 class CountrySearchResultEvent:
-    def __init__(self, country: Country):
+    def __init__(self, country: Country, generation: int | None = None):
         self._country = country
+        self._generation = generation
 
 
     def country(self) -> Country:
         return self._country
 
 
+    def generation(self) -> int | None:
+        return self._generation
+
+
     def __repr__(self) -> str:
-        return f'{type(self).__name__}: country = {repr(self._country)}'
+        return f'{type(self).__name__}: country = {repr(self._country)}, ' + \
+               f'generation = {repr(self._generation)}'
+
+
+
+class CountrySearchResultBatchEvent:
+    def __init__(self, countries: tuple[Country, ...], generation: int | None = None):
+        self._countries = countries
+        self._generation = generation
+
+
+    def countries(self) -> tuple[Country, ...]:
+        return self._countries
+
+
+    def generation(self) -> int | None:
+        return self._generation
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: countries = {repr(self._countries)}, ' + \
+               f'generation = {repr(self._generation)}'
+
+
+
+class CountrySearchResultColumnsEvent:
+    def __init__(self, columns: SearchResultColumns, generation: int | None = None):
+        self._columns = columns
+        self._generation = generation
+
+
+    def columns(self) -> SearchResultColumns:
+        return self._columns
+
+
+    def generation(self) -> int | None:
+        return self._generation
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: columns = {repr(self._columns)}, ' + \
+               f'generation = {repr(self._generation)}'
+
+
+
+class CountrySearchPageCompleteEvent:
+    def __init__(self, after_country_id: int | None, generation: int | None = None):
+        self._after_country_id = after_country_id
+        self._generation = generation
+
+
+    def after_country_id(self) -> int | None:
+        return self._after_country_id
+
+
+    def has_more(self) -> bool:
+        return self._after_country_id is not None
+
+
+    def generation(self) -> int | None:
+        return self._generation
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: after_country_id = {repr(self._after_country_id)}, ' + \
+               f'generation = {repr(self._generation)}'
 
 
 
@@ -90,6 +195,40 @@ class CountryLoadedEvent:
 
 
 
+class LoadCountriesEvent:
+    def __init__(self, country_ids: tuple[int, ...]):
+        self._country_ids = tuple(country_ids)
+
+
+    def country_ids(self) -> tuple[int, ...]:
+        return self._country_ids
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: country_ids = {repr(self._country_ids)}'
+
+
+
+class CountriesLoadedEvent:
+    def __init__(self, countries: tuple[Country, ...], not_found_ids: tuple[int, ...] = ()):
+        self._countries = countries
+        self._not_found_ids = not_found_ids
+
+
+    def countries(self) -> tuple[Country, ...]:
+        return self._countries
+
+
+    def not_found_ids(self) -> tuple[int, ...]:
+        return self._not_found_ids
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: countries = {repr(self._countries)}, ' + \
+               f'not_found_ids = {repr(self._not_found_ids)}'
+
+
+
 class SaveNewCountryEvent:
     def __init__(self, country: Country):
         self._country = country
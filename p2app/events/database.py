@@ -13,17 +13,32 @@ from pathlib import Path
 
 
 
+PERFORMANCE_PROFILES = ('interactive', 'bulk-load', 'read-only-share')
+
+
+
 class OpenDatabaseEvent:
-    def __init__(self, path: Path):
+    def __init__(self, path: Path, is_snapshot: bool = False, profile: str | None = None):
         self._path = path
+        self._is_snapshot = is_snapshot
+        self._profile = profile
 
 
     def path(self) -> Path:
         return self._path
 
 
+    def is_snapshot(self) -> bool:
+        return self._is_snapshot
+
+
+    def profile(self) -> str | None:
+        return self._profile
+
+
     def __repr__(self) -> str:
-        return f'{type(self).__name__}: path = {repr(self._path)}'
+        return f'{type(self).__name__}: path = {repr(self._path)}, ' + \
+               f'is_snapshot = {repr(self._is_snapshot)}, profile = {repr(self._profile)}'
 
 
 
@@ -34,16 +49,46 @@ class CloseDatabaseEvent:
 
 
 class DatabaseOpenedEvent:
-    def __init__(self, path: Path):
+    def __init__(self, path: Path, missing_indexes: tuple[str, ...] = (),
+                 snapshot_size: int | None = None, snapshot_seconds: float | None = None,
+                 pragmas: dict[str, int | str] | None = None):
         self._path = path
+        self._missing_indexes = missing_indexes
+        self._snapshot_size = snapshot_size
+        self._snapshot_seconds = snapshot_seconds
+        self._pragmas = pragmas if pragmas is not None else {}
 
 
     def path(self) -> Path:
         return self._path
 
 
+    def missing_indexes(self) -> tuple[str, ...]:
+        return self._missing_indexes
+
+
+    def is_snapshot(self) -> bool:
+        return self._snapshot_size is not None
+
+
+    def snapshot_size(self) -> int | None:
+        return self._snapshot_size
+
+
+    def snapshot_seconds(self) -> float | None:
+        return self._snapshot_seconds
+
+
+    def pragmas(self) -> dict[str, int | str]:
+        return self._pragmas
+
+
     def __repr__(self) -> str:
-        return f'{type(self).__name__}: path = {repr(self._path)}'
+        return f'{type(self).__name__}: path = {repr(self._path)}, ' + \
+               f'missing_indexes = {repr(self._missing_indexes)}, ' + \
+               f'snapshot_size = {repr(self._snapshot_size)}, ' + \
+               f'snapshot_seconds = {repr(self._snapshot_seconds)}, ' + \
+               f'pragmas = {repr(self._pragmas)}'
 
 
 
@@ -64,3 +109,42 @@ class DatabaseOpenFailedEvent:
 class DatabaseClosedEvent:
     def __repr__(self) -> str:
         return f'{type(self).__name__}'
+
+
+
+class ConfigureGroupCommitEvent:
+    def __init__(self, rows: int | None, seconds: float | None = None):
+        self._rows = rows
+        self._seconds = seconds
+
+
+    def rows(self) -> int | None:
+        return self._rows
+
+
+    def seconds(self) -> float | None:
+        return self._seconds
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: rows = {repr(self._rows)}, seconds = {repr(self._seconds)}'
+
+
+
+class FlushWritesEvent:
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}'
+
+
+
+class PendingWritesEvent:
+    def __init__(self, count: int):
+        self._count = count
+
+
+    def count(self) -> int:
+        return self._count
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: count = {repr(self._count)}'
@@ -11,6 +11,10 @@
 # * The user interface's internal events are routed back to the user interface
 #   to be processed, with the engine never seeing them.
 #
+# A threaded engine processes events on a thread of its own, so its results are
+# routed back to the user interface later, whenever the user interface asks for
+# them to be delivered.
+#
 # YOU WILL NOT NEED TO MODIFY THIS FILE AT ALL
 
 
@@ -19,6 +23,7 @@ class EventBus:
     def __init__(self):
         self._view = None
         self._engine = None
+        self._is_engine_threaded = False
         self._is_debug_mode = False
 
 
@@ -26,8 +31,13 @@ class EventBus:
         self._view = view
 
 
-    def register_engine(self, engine):
+    def register_engine(self, engine, is_threaded = False):
         self._engine = engine
+        self._is_engine_threaded = is_threaded
+
+
+    def is_engine_threaded(self):
+        return self._is_engine_threaded
 
 
     def enable_debug_mode(self):
@@ -42,8 +52,26 @@ class EventBus:
         if self._is_debug_mode:
             print(f'Sent by view  : {event}')
 
+        if self._is_engine_threaded:
+            self._engine.submit(event)
+            return
+
         for result_event in self._engine.process_event(event):
-            if self._is_debug_mode:
-                print(f'Sent by engine: {result_event}')
+            self._deliver(result_event)
+
+
+    def deliver_completed_events(self, limit):
+        delivered = 0
+
+        for result_event in self._engine.completed_events(limit):
+            self._deliver(result_event)
+            delivered += 1
+
+        return delivered == limit
+
+
+    def _deliver(self, result_event):
+        if self._is_debug_mode:
+            print(f'Sent by engine: {result_event}')
 
-            self._view.handle_event(result_event)
+        self._view.handle_event(result_event)
@@ -12,6 +12,8 @@
 
 from collections import namedtuple
 
+from .results import SearchResultColumns
+
 
 
 Region = namedtuple(
@@ -33,10 +35,18 @@ Region.__annotations__ = {
 
 
 class StartRegionSearchEvent:
-    def __init__(self, region_code: str, local_code: str, name: str):
+    def __init__(self, region_code: str, local_code: str, name: str,
+                 page_size: int | None = None, after_region_id: int | None = None,
+                 batch_size: int | None = None, generation: int | None = None,
+                 is_columnar: bool = False):
         self._region_code = region_code
         self._local_code = local_code
         self._name = name
+        self._page_size = page_size
+        self._after_region_id = after_region_id
+        self._batch_size = batch_size
+        self._generation = generation
+        self._is_columnar = is_columnar
 
 
     def region_code(self) -> str:
@@ -51,23 +61,118 @@ class StartRegionSearchEvent:
         return self._name
 
 
+    def page_size(self) -> int | None:
+        return self._page_size
+
+
+    def after_region_id(self) -> int | None:
+        return self._after_region_id
+
+
+    def batch_size(self) -> int | None:
+        return self._batch_size
+
+
+    def generation(self) -> int | None:
+        return self._generation
+
+
+    def is_columnar(self) -> bool:
+        return self._is_columnar
+
+
     def __repr__(self) -> str:
         return f'{type(self).__name__}: region_code = {repr(self._region_code)}, ' + \
-               f'local_name = {repr(self._local_code)}, name = {repr(self._name)}'
+               f'local_name = {repr(self._local_code)}, name = {repr(self._name)}, ' + \
+               f'page_size = {repr(self._page_size)}, ' + \
+               f'after_region_id = {repr(self._after_region_id)}, ' + \
+               f'batch_size = {repr(self._batch_size)}, ' + \
+               f'generation = {repr(self._generation)}, ' + \
+               f'is_columnar = {repr(self._is_columnar)}'
 
 
 
 class RegionSearchResultEvent:
-    def __init__(self, region: Region):
+    def __init__(self, region: Region, generation: int | None = None):
         self._region = region
+        self._generation = generation
 
 
     def region(self) -> Region:
         return self._region
 
 
+    def generation(self) -> int | None:
+        return self._generation
+
+
     def __repr__(self) -> str:
-        return f'{type(self).__name__}: region = {repr(self._region)}'
+        return f'{type(self).__name__}: region = {repr(self._region)}, ' + \
+               f'generation = {repr(self._generation)}'
+
+
+
+class RegionSearchResultBatchEvent:
+    def __init__(self, regions: tuple[Region, ...], generation: int | None = None):
+        self._regions = regions
+        self._generation = generation
+
+
+    def regions(self) -> tuple[Region, ...]:
+        return self._regions
+
+
+    def generation(self) -> int | None:
+        return self._generation
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: regions = {repr(self._regions)}, ' + \
+               f'generation = {repr(self._generation)}'
+
+
+
+class RegionSearchResultColumnsEvent:
+    def __init__(self, columns: SearchResultColumns, generation: int | None = None):
+        self._columns = columns
+        self._generation = generation
+
+
+    def columns(self) -> SearchResultColumns:
+        return self._columns
+
+
+    def generation(self) -> int | None:
+        return self._generation
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: columns = {repr(self._columns)}, ' + \
+               f'generation = {repr(self._generation)}'
+
+
+
+class RegionSearchPageCompleteEvent:
+    def __init__(self, after_region_id: int | None, generation: int | None = None):
+        self._after_region_id = after_region_id
+        self._generation = generation
+
+
+    def after_region_id(self) -> int | None:
+        return self._after_region_id
+
+
+    def has_more(self) -> bool:
+        return self._after_region_id is not None
+
+
+    def generation(self) -> int | None:
+        return self._generation
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: after_region_id = {repr(self._after_region_id)}, ' + \
+               f'generation = {repr(self._generation)}'
 
 
 
@@ -99,6 +204,40 @@ class RegionLoadedEvent:
 
 
 
+class LoadRegionsEvent:
+    def __init__(self, region_ids: tuple[int, ...]):
+        self._region_ids = tuple(region_ids)
+
+
+    def region_ids(self) -> tuple[int, ...]:
+        return self._region_ids
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: region_ids = {repr(self._region_ids)}'
+
+
+
+class RegionsLoadedEvent:
+    def __init__(self, regions: tuple[Region, ...], not_found_ids: tuple[int, ...] = ()):
+        self._regions = regions
+        self._not_found_ids = not_found_ids
+
+
+    def regions(self) -> tuple[Region, ...]:
+        return self._regions
+
+
+    def not_found_ids(self) -> tuple[int, ...]:
+        return self._not_found_ids
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: regions = {repr(self._regions)}, ' + \
+               f'not_found_ids = {repr(self._not_found_ids)}'
+
+
+
 class SaveNewRegionEvent:
     def __init__(self, region: Region):
         self._region = region
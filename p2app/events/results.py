@@ -0,0 +1,60 @@
+# p2app/events/results.py
+#
+# ICS 33 Winter 2025
+# Project 2: Learning to Fly
+#
+# A compact, columnar container for search results, holding only what a list of
+# results shows: each result's ID, code, and name.
+#
+# The IDs are kept in an array of 64-bit integers, rather than as separate int
+# objects, and the codes and names in parallel lists, so that a result costs its
+# two strings and a few dozen bytes, rather than a record, a string for every one
+# of its columns, and the text a view shows for it.  The strings aren't interned:
+# codes are unique and names very nearly so, so interning them would only add an
+# entry to the interpreter's table of interned strings for every result.
+
+from array import array
+
+
+
+class SearchResultColumns:
+    def __init__(self):
+        self._ids = array('q')
+        self._codes = []
+        self._names = []
+
+
+    def append(self, result_id: int, code: str | None, name: str | None) -> None:
+        self._ids.append(result_id)
+        self._codes.append(code)
+        self._names.append(name)
+
+
+    def extend(self, columns: 'SearchResultColumns') -> None:
+        self._ids.extend(columns._ids)
+        self._codes.extend(columns._codes)
+        self._names.extend(columns._names)
+
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+
+    def result_id(self, index: int) -> int:
+        return self._ids[index]
+
+
+    def code(self, index: int) -> str | None:
+        return self._codes[index]
+
+
+    def name(self, index: int) -> str | None:
+        return self._names[index]
+
+
+    def result_ids(self) -> array:
+        return self._ids
+
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}: {len(self._ids)} results'
@@ -8,17 +8,34 @@
 #
 # YOU WILL NOT NEED TO MODIFY THIS FILE AT ALL
 
+import itertools
 import tkinter
 import tkinter.messagebox
 from p2app.events import *
 from .event_handling import EventHandler
+from .virtual_list import VirtualList
 from .events import *
 
 
 
+_SEARCH_PAGE_SIZE = 1000
+_SEARCH_BATCH_SIZE = 500
+
+# numbers each search, so that a newer search cancels any older one still running
+_search_generations = itertools.count(1)
+
+
+
 class ContinentsView(tkinter.Frame, EventHandler):
+    HANDLED_EVENTS = (
+        SaveContinentFailedEvent, DiscardContinentEvent, NewContinentEvent,
+        StartEditingContinentEvent, ContinentLoadedEvent, ContinentSavedEvent
+    )
+
+
     def __init__(self, parent):
         super().__init__(parent)
+        self.subscribe()
 
         search_view = _ContinentsSearchView(self)
         search_view.grid(row = 0, column = 0, sticky = tkinter.NSEW)
@@ -59,8 +76,15 @@ class ContinentsView(tkinter.Frame, EventHandler):
 
 
 class _ContinentsSearchView(tkinter.LabelFrame, EventHandler):
+    HANDLED_EVENTS = (
+        ClearContinentsSearchListEvent, ContinentSearchResultColumnsEvent,
+        ContinentSearchPageCompleteEvent
+    )
+
+
     def __init__(self, parent):
         super().__init__(parent, text = 'Continent Search')
+        self.subscribe()
 
         code_label = tkinter.Label(self, text = 'Continent Code: ')
         code_label.grid(row = 0, column = 0, padx = 5, pady = 5, sticky = tkinter.E)
@@ -89,16 +113,13 @@ class _ContinentsSearchView(tkinter.LabelFrame, EventHandler):
         empty_area = tkinter.Label(self, text = '')
         empty_area.grid(row = 3, column = 1, sticky = tkinter.NSEW, padx = 5, pady = 5)
 
-        self._search_list = tkinter.Listbox(
-            self, height = 4,
-            activestyle = tkinter.NONE, selectmode = tkinter.SINGLE)
-
-        self._search_list.bind('<<ListboxSelect>>', self._on_search_selection_changed)
+        self._search_list = VirtualList(self, height = 4, on_fetch_page = self._on_fetch_page)
+        self._search_list.bind('<<VirtualListSelect>>', self._on_search_selection_changed)
         self._search_list.grid(
             row = 0, column = 2, rowspan = 4, columnspan = 1, sticky = tkinter.NSEW,
             padx = 5, pady = 5)
 
-        self._search_continent_ids = []
+        self._search_filters = None
 
         button_frame = tkinter.Frame(self)
         button_frame.grid(row = 4, column = 2, sticky = tkinter.E, padx = 5, pady = 5)
@@ -127,7 +148,16 @@ class _ContinentsSearchView(tkinter.LabelFrame, EventHandler):
 
     def _on_search_button_clicked(self):
         self.initiate_event(ClearContinentsSearchListEvent())
-        self.initiate_event(StartContinentSearchEvent(self._get_search_code(), self._get_search_name()))
+        self._search_filters = (self._get_search_code(), self._get_search_name())
+        self.initiate_event(StartContinentSearchEvent(
+            *self._search_filters, _SEARCH_PAGE_SIZE, batch_size = _SEARCH_BATCH_SIZE,
+            generation = next(_search_generations), is_columnar = True))
+
+
+    def _on_fetch_page(self, after_continent_id):
+        self.initiate_event(StartContinentSearchEvent(
+            *self._search_filters, _SEARCH_PAGE_SIZE, after_continent_id,
+            _SEARCH_BATCH_SIZE, next(_search_generations), True))
 
 
     def _get_search_code(self):
@@ -141,8 +171,7 @@ class _ContinentsSearchView(tkinter.LabelFrame, EventHandler):
 
 
     def _get_selected_search_continent_id(self):
-        selection, *_ = self._search_list.curselection()
-        return self._search_continent_ids[selection]
+        return self._search_list.selected_id()
 
 
     def _on_search_changed(self, *args):
@@ -156,7 +185,7 @@ class _ContinentsSearchView(tkinter.LabelFrame, EventHandler):
 
 
     def _on_search_selection_changed(self, event):
-        if event.widget.curselection():
+        if self._search_list.selected_id() is not None:
             new_state = tkinter.NORMAL
         else:
             new_state = tkinter.DISABLED
@@ -177,13 +206,12 @@ class _ContinentsSearchView(tkinter.LabelFrame, EventHandler):
 
     def on_event(self, event):
         if isinstance(event, ClearContinentsSearchListEvent):
-            self._search_list.delete(0, tkinter.END)
-            self._search_continent_ids = []
+            self._search_list.clear()
             self._edit_button['state'] = tkinter.DISABLED
-        elif isinstance(event, ContinentSearchResultEvent):
-            display_name = f'{event.continent().continent_code} - {event.continent().name}'
-            self._search_list.insert(tkinter.END, display_name)
-            self._search_continent_ids.append(event.continent().continent_id)
+        elif isinstance(event, ContinentSearchResultColumnsEvent):
+            self._search_list.extend(event.columns())
+        elif isinstance(event, ContinentSearchPageCompleteEvent):
+            self._search_list.complete_page(event.after_continent_id())
 
 
 
@@ -7,6 +7,11 @@
 # (e.g., the events returned from the p2app.engine package, or events that are
 # internal to the user interface).
 #
+# Each handler declares the types of events it handles and subscribes to them
+# when it's created, so that an event is only sent to the handlers interested in
+# it, rather than to every widget in the window.  A handler is unsubscribed when
+# it's destroyed.
+#
 # YOU WILL NOT NEED TO MODIFY THIS FILE AT ALL
 
 import tkinter
@@ -14,17 +19,20 @@ import tkinter
 
 
 class EventHandler:
+    # the types of events this handler's on_event and on_event_post methods handle
+    HANDLED_EVENTS = ()
+
+
     def initiate_event(self, event):
-        widget = self
+        self._outermost_handler().initiate_event(event)
 
-        if not isinstance(widget, tkinter.Widget):
-            pass
 
-        while widget.master is not None:
-            widget = widget.master
+    def subscribe(self):
+        routes = self._outermost_handler().event_routes()
+        routes.subscribe(self)
 
-        if widget is not None:
-            widget.initiate_event(event)
+        if isinstance(self, tkinter.Widget):
+            self.bind('<Destroy>', lambda destroy_event: routes.unsubscribe(self), add = '+')
 
 
     def handle_event(self, event):
@@ -47,3 +55,62 @@ class EventHandler:
 
     def on_event_post(self, event):
         pass
+
+
+    def _outermost_handler(self):
+        widget = self
+
+        while getattr(widget, 'master', None) is not None:
+            widget = widget.master
+
+        return widget
+
+
+
+class EventRoutes:
+    def __init__(self):
+        # the subscribed handlers, in the order they subscribed, as the keys of a
+        # dictionary so that checking whether one is still subscribed is quick
+        self._handlers = {}
+
+        # the handlers subscribed to each type of event, worked out the first time an
+        # event of that type is routed after the subscriptions change
+        self._routes = {}
+
+
+    def subscribe(self, handler):
+        self._handlers[handler] = None
+        self._routes.clear()
+
+
+    def unsubscribe(self, handler):
+        if handler in self._handlers:
+            del self._handlers[handler]
+            self._routes.clear()
+
+
+    def subscribers(self, event_type):
+        try:
+            return self._routes[event_type]
+        except KeyError:
+            subscribers = tuple(
+                handler for handler in self._handlers
+                if issubclass(event_type, handler.HANDLED_EVENTS))
+
+            self._routes[event_type] = subscribers
+            return subscribers
+
+
+    def route(self, event):
+        # Handlers subscribe before the handlers inside them do, so, as when an event
+        # is sent down the widget tree, outer handlers see an event first in on_event
+        # and last in on_event_post.  Handlers destroyed along the way are skipped.
+        subscribers = self.subscribers(type(event))
+
+        for handler in subscribers:
+            if handler in self._handlers:
+                handler.on_event(event)
+
+        for handler in reversed(subscribers):
+            if handler in self._handlers:
+                handler.on_event_post(event)
@@ -14,7 +14,7 @@ from .continents import ContinentsView
 from .countries import CountriesView
 from .empty import EmptyView
 from .events import *
-from .event_handling import EventHandler
+from .event_handling import EventHandler, EventRoutes
 from .menus import MainMenu
 from .regions import RegionsView
 
@@ -25,15 +25,31 @@ _INITIAL_WINDOW_HEIGHT = 600
 _PROJECT_NAME = 'ICS 33 - Project 2'
 _MISSING_DATABASE_NAME = '[no database open]'
 
+# how often a threaded engine's results are delivered, and how many at a time, so
+# that the window is repainted between deliveries
+_ENGINE_POLL_MILLISECONDS = 20
+_MAX_EVENTS_PER_POLL = 100
+
 
 
 class MainView(tkinter.Tk, EventHandler):
+    HANDLED_EVENTS = (
+        ShowEditContinentsViewEvent, ShowEditCountriesViewEvent, ShowEditRegionsViewEvent,
+        DatabaseOpenedEvent, DatabaseClosedEvent, DatabaseOpenFailedEvent,
+        EnableDebugModeEvent, DisableDebugModeEvent, EngineStatisticsEvent,
+        EndApplicationEvent, ErrorEvent
+    )
+
+
     def __init__(self, event_bus):
         super().__init__()
+        self._event_routes = EventRoutes()
+        self._event_routes.subscribe(self)
         self.geometry(f'{_INITIAL_WINDOW_WIDTH}x{_INITIAL_WINDOW_HEIGHT}')
         self.config(menu = MainMenu(self))
         self._event_bus = event_bus
         self._current_view = None
+        self._is_ended = False
         self.rowconfigure(0, weight = 1)
         self.columnconfigure(0, weight = 1)
 
@@ -45,9 +61,21 @@ class MainView(tkinter.Tk, EventHandler):
             self._event_bus.initiate_event(event)
 
 
+    def event_routes(self):
+        return self._event_routes
+
+
+    def handle_event(self, event):
+        self._event_routes.route(event)
+
+
     def run(self):
         self._switch_view(EmptyView(self))
         self._update_database_path(None)
+
+        if self._event_bus.is_engine_threaded():
+            self.after(_ENGINE_POLL_MILLISECONDS, self._poll_engine)
+
         self.mainloop()
 
 
@@ -59,7 +87,13 @@ class MainView(tkinter.Tk, EventHandler):
         elif isinstance(event, ShowEditRegionsViewEvent):
             self._switch_view(RegionsView(self))
         elif isinstance(event, DatabaseOpenedEvent):
-            self._update_database_path(event.path())
+            self._update_database_path(event.path(), event)
+
+            if event.missing_indexes():
+                tkinter.messagebox.showwarning(
+                    'Missing Indexes',
+                    'Searches will be slower because the database is missing these indexes '
+                    'and could not be changed:\n' + '\n'.join(event.missing_indexes()))
         elif isinstance(event, DatabaseClosedEvent):
             self._update_database_path(None)
             self._switch_view(EmptyView(self))
@@ -71,15 +105,25 @@ class MainView(tkinter.Tk, EventHandler):
             self._event_bus.enable_debug_mode()
         elif isinstance(event, DisableDebugModeEvent):
             self._event_bus.disable_debug_mode()
+        elif isinstance(event, EngineStatisticsEvent):
+            tkinter.messagebox.showinfo('Engine Statistics', _format_statistics(event.statistics()))
 
 
     def on_event_post(self, event):
         if isinstance(event, EndApplicationEvent):
+            self._is_ended = True
             self.destroy()
         elif isinstance(event, ErrorEvent):
             tkinter.messagebox.showerror('Error', event.message())
 
 
+    def _poll_engine(self):
+        has_more = self._event_bus.deliver_completed_events(_MAX_EVENTS_PER_POLL)
+
+        if not self._is_ended:
+            self.after(1 if has_more else _ENGINE_POLL_MILLISECONDS, self._poll_engine)
+
+
     def _switch_view(self, view):
         if self._current_view:
             self._current_view.destroy()
@@ -88,10 +132,30 @@ class MainView(tkinter.Tk, EventHandler):
         self._current_view.grid(row = 0, column = 0, sticky = tkinter.NSEW, padx = 5, pady = 5)
 
 
-    def _update_database_path(self, path):
+    def _update_database_path(self, path, opened_event = None):
         if path:
             visible_name = path.name
         else:
             visible_name = _MISSING_DATABASE_NAME
 
+        if opened_event and opened_event.is_snapshot():
+            snapshot_megabytes = opened_event.snapshot_size() / (1024 * 1024)
+            visible_name += f' [snapshot: {snapshot_megabytes:.1f} MB ' + \
+                            f'copied in {opened_event.snapshot_seconds():.2f} s]'
+
         self.title(f'{_PROJECT_NAME} - {visible_name}')
+
+
+
+def _format_statistics(statistics):
+    lines = []
+
+    for name, value in statistics.items():
+        if isinstance(value, float) and name.endswith('_rate'):
+            lines.append(f'{name}: {value:.1%}')
+        elif isinstance(value, float):
+            lines.append(f'{name}: {value:.3f}')
+        else:
+            lines.append(f'{name}: {value}')
+
+    return '\n'.join(lines)
@@ -16,6 +16,9 @@ from .event_handling import EventHandler
 
 
 _OPEN_DATABASE_DIALOG_TITLE = 'Open Database'
+_OPEN_SNAPSHOT_DIALOG_TITLE = 'Open Database Snapshot'
+_GROUP_COMMIT_ROWS = 100
+_GROUP_COMMIT_SECONDS = 2.0
 
 
 
@@ -26,8 +29,12 @@ class BaseMenu(tkinter.Menu, EventHandler):
 
 
 class MainMenu(BaseMenu):
+    HANDLED_EVENTS = (DatabaseOpenedEvent, DatabaseClosedEvent)
+
+
     def __init__(self, parent):
         super().__init__(parent)
+        self.subscribe()
         self.add_cascade(label = 'File', menu = FileMenu(self))
         self.add_cascade(label = 'Debug', menu = DebugMenu(self))
 
@@ -41,10 +48,30 @@ class MainMenu(BaseMenu):
 
 
 class FileMenu(BaseMenu):
+    HANDLED_EVENTS = (DatabaseOpenedEvent, DatabaseClosedEvent, PendingWritesEvent)
+
+
     def __init__(self, parent):
         super().__init__(parent)
+        self.subscribe()
         self.add_command(label = 'Open', state = tkinter.NORMAL, command = self._on_open)
+        self.add_command(
+            label = 'Open Snapshot', state = tkinter.NORMAL, command = self._on_open_snapshot)
         self.add_command(label = 'Close', state = tkinter.DISABLED, command = self._on_close)
+        self._profile_menu = ProfileMenu(self)
+        self.add_cascade(label = 'Performance Profile', menu = self._profile_menu)
+
+        self._is_group_commit = tkinter.IntVar(self, 0)
+        self.add_checkbutton(
+            label = 'Group Commit Writes', variable = self._is_group_commit,
+            command = self._on_change_group_commit)
+
+        self.add_command(
+            label = 'Flush Pending Writes', state = tkinter.DISABLED,
+            command = self._on_flush_writes)
+        self._flush_index = self.index(tkinter.END)
+        self._flush_id = None
+
         self.add_command(label = 'Exit', command = self._on_exit)
 
 
@@ -54,7 +81,41 @@ class FileMenu(BaseMenu):
             initialdir = Path.cwd())
 
         if open_path:
-            self.initiate_event(OpenDatabaseEvent(Path(open_path)))
+            self.initiate_event(OpenDatabaseEvent(Path(open_path), profile = self._get_profile()))
+
+
+    def _on_open_snapshot(self):
+        open_path = tkinter.filedialog.askopenfilename(
+            title = _OPEN_SNAPSHOT_DIALOG_TITLE,
+            initialdir = Path.cwd())
+
+        if open_path:
+            self.initiate_event(OpenDatabaseEvent(
+                Path(open_path), is_snapshot = True, profile = self._get_profile()))
+
+
+    def _get_profile(self):
+        profile = self._profile_menu.profile()
+        return profile if profile else None
+
+
+    def _on_change_group_commit(self):
+        if self._is_group_commit.get():
+            self.initiate_event(ConfigureGroupCommitEvent(_GROUP_COMMIT_ROWS, _GROUP_COMMIT_SECONDS))
+        else:
+            self.initiate_event(ConfigureGroupCommitEvent(None))
+
+
+    def _on_flush_writes(self):
+        self.initiate_event(FlushWritesEvent())
+
+
+    def _on_flush_due(self):
+        # the engine only checks how long writes have been pending when it's sent an
+        # event, so they're flushed once the oldest has waited long enough, even if
+        # nothing else happens in the meantime
+        self._flush_id = None
+        self.initiate_event(FlushWritesEvent())
 
 
     def _on_close(self):
@@ -68,10 +129,58 @@ class FileMenu(BaseMenu):
     def on_event(self, event):
         if isinstance(event, DatabaseOpenedEvent):
             self.entryconfig('Open', state = tkinter.DISABLED)
+            self.entryconfig('Open Snapshot', state = tkinter.DISABLED)
             self.entryconfig('Close', state = tkinter.NORMAL)
         elif isinstance(event, DatabaseClosedEvent):
             self.entryconfig('Open', state = tkinter.NORMAL)
+            self.entryconfig('Open Snapshot', state = tkinter.NORMAL)
             self.entryconfig('Close', state = tkinter.DISABLED)
+        elif isinstance(event, PendingWritesEvent):
+            if event.count():
+                self.entryconfig(
+                    self._flush_index, label = f'Flush Pending Writes ({event.count()})',
+                    state = tkinter.NORMAL)
+
+                if self._flush_id is None:
+                    self._flush_id = self.after(
+                        int(_GROUP_COMMIT_SECONDS * 1000), self._on_flush_due)
+            else:
+                self.entryconfig(
+                    self._flush_index, label = 'Flush Pending Writes', state = tkinter.DISABLED)
+
+                if self._flush_id is not None:
+                    self.after_cancel(self._flush_id)
+                    self._flush_id = None
+
+
+
+class ProfileMenu(BaseMenu):
+    HANDLED_EVENTS = (DatabaseOpenedEvent, DatabaseClosedEvent)
+
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.subscribe()
+
+        self._profile = tkinter.StringVar(self, '')
+
+        self.add_radiobutton(label = 'Default', variable = self._profile, value = '')
+
+        for profile in PERFORMANCE_PROFILES:
+            self.add_radiobutton(label = profile, variable = self._profile, value = profile)
+
+
+    def profile(self):
+        return self._profile.get()
+
+
+    def on_event(self, event):
+        if isinstance(event, DatabaseOpenedEvent):
+            for index in range(len(PERFORMANCE_PROFILES) + 1):
+                self.entryconfig(index, state = tkinter.DISABLED)
+        elif isinstance(event, DatabaseClosedEvent):
+            for index in range(len(PERFORMANCE_PROFILES) + 1):
+                self.entryconfig(index, state = tkinter.NORMAL)
 
 
 
@@ -106,9 +215,15 @@ class DebugMenu(BaseMenu):
             label = 'Show Events', variable = self._is_debug_mode,
             command = self._on_change_show_events)
 
+        self.add_command(label = 'Show Engine Statistics', command = self._on_show_statistics)
+
 
     def _on_change_show_events(self):
         if self._is_debug_mode.get():
             self.initiate_event(EnableDebugModeEvent())
         else:
             self.initiate_event(DisableDebugModeEvent())
+
+
+    def _on_show_statistics(self):
+        self.initiate_event(EngineStatisticsRequestedEvent())
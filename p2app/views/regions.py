@@ -8,17 +8,37 @@
 #
 # YOU WILL NOT NEED TO MODIFY THIS FILE AT ALL
 
+import itertools
 import tkinter
 import tkinter.messagebox
 from p2app.events import *
 from .event_handling import EventHandler
+from .virtual_list import VirtualList
 from .events import *
 
 
 
+_SEARCH_PAGE_SIZE = 1000
+_SEARCH_BATCH_SIZE = 500
+
+# numbers each search, so that a newer search cancels any older one still running
+_search_generations = itertools.count(1)
+
+# how long typing has to pause before a live search starts
+_LIVE_SEARCH_DELAY_MILLISECONDS = 250
+
+
+
 class RegionsView(tkinter.Frame, EventHandler):
+    HANDLED_EVENTS = (
+        SaveRegionFailedEvent, DiscardRegionEvent, NewRegionEvent, StartEditingRegionEvent,
+        RegionLoadedEvent, RegionSavedEvent
+    )
+
+
     def __init__(self, parent):
         super().__init__(parent)
+        self.subscribe()
 
         search_view = _RegionsSearchView(self)
         search_view.grid(row = 0, column = 0, sticky = tkinter.NSEW)
@@ -60,8 +80,15 @@ class RegionsView(tkinter.Frame, EventHandler):
 
 
 class _RegionsSearchView(tkinter.LabelFrame, EventHandler):
+    HANDLED_EVENTS = (
+        ClearRegionsSearchListEvent, RegionSearchResultColumnsEvent,
+        RegionSearchPageCompleteEvent
+    )
+
+
     def __init__(self, parent):
         super().__init__(parent, text = 'Region Search')
+        self.subscribe()
 
         region_code_label = tkinter.Label(self, text = 'Region Code: ')
         region_code_label.grid(row = 0, column = 0, padx = 5, pady = 5, sticky = tkinter.E)
@@ -96,19 +123,24 @@ class _RegionsSearchView(tkinter.LabelFrame, EventHandler):
 
         self._search_button.grid(row = 3, column = 1, sticky = tkinter.E, padx = 5, pady = 5)
 
+        self._is_live_search = tkinter.BooleanVar(value = False)
+
+        live_search_button = tkinter.Checkbutton(
+            self, text = 'Live Search', variable = self._is_live_search)
+
+        live_search_button.grid(row = 3, column = 0, sticky = tkinter.W, padx = 5, pady = 5)
+        self._live_search_id = None
+
         empty_area = tkinter.Label(self, text = '')
         empty_area.grid(row = 4, column = 1, sticky = tkinter.NSEW, padx = 5, pady = 5)
 
-        self._search_list = tkinter.Listbox(
-            self, height = 4,
-            activestyle = tkinter.NONE, selectmode = tkinter.SINGLE)
-
-        self._search_list.bind('<<ListboxSelect>>', self._on_search_selection_changed)
+        self._search_list = VirtualList(self, height = 4, on_fetch_page = self._on_fetch_page)
+        self._search_list.bind('<<VirtualListSelect>>', self._on_search_selection_changed)
         self._search_list.grid(
             row = 0, column = 2, rowspan = 4, columnspan = 1, sticky = tkinter.NSEW,
             padx = 5, pady = 5)
 
-        self._search_region_ids = []
+        self._search_filters = None
 
         button_frame = tkinter.Frame(self)
         button_frame.grid(row = 5, column = 2, sticky = tkinter.E, padx = 5, pady = 5)
@@ -136,11 +168,27 @@ class _RegionsSearchView(tkinter.LabelFrame, EventHandler):
         self.columnconfigure(2, weight = 2)
 
 
+    def destroy(self):
+        if self._live_search_id is not None:
+            self.after_cancel(self._live_search_id)
+
+        super().destroy()
+
+
     def _on_search_button_clicked(self):
         self.initiate_event(ClearRegionsSearchListEvent())
-        self.initiate_event(StartRegionSearchEvent(
+        self._search_filters = (
             self._get_search_region_code(), self._get_search_local_code(),
-            self._get_search_name()))
+            self._get_search_name())
+        self.initiate_event(StartRegionSearchEvent(
+            *self._search_filters, _SEARCH_PAGE_SIZE, batch_size = _SEARCH_BATCH_SIZE,
+            generation = next(_search_generations), is_columnar = True))
+
+
+    def _on_fetch_page(self, after_region_id):
+        self.initiate_event(StartRegionSearchEvent(
+            *self._search_filters, _SEARCH_PAGE_SIZE, after_region_id,
+            _SEARCH_BATCH_SIZE, next(_search_generations), True))
 
 
     def _get_search_region_code(self):
@@ -159,8 +207,7 @@ class _RegionsSearchView(tkinter.LabelFrame, EventHandler):
 
 
     def _get_selected_search_region_id(self):
-        selection, *_ = self._search_list.curselection()
-        return self._search_region_ids[selection]
+        return self._search_list.selected_id()
 
 
     def _on_search_changed(self, *args):
@@ -172,11 +219,37 @@ class _RegionsSearchView(tkinter.LabelFrame, EventHandler):
             new_state = tkinter.DISABLED
 
         self._search_button['state'] = new_state
+
+        if self._is_live_search.get():
+            if self._live_search_id is not None:
+                self.after_cancel(self._live_search_id)
+
+            self._live_search_id = self.after(
+                _LIVE_SEARCH_DELAY_MILLISECONDS, self._on_live_search)
+
         return True
 
 
+    def _on_live_search(self):
+        self._live_search_id = None
+
+        if self._search_button['state'] == tkinter.DISABLED:
+            return
+
+        # a live search asks for every result at once, rather than a page at a time, so
+        # that the engine can narrow them in memory as the search is typed rather than
+        # asking the database again
+        self.initiate_event(ClearRegionsSearchListEvent())
+        self._search_filters = (
+            self._get_search_region_code(), self._get_search_local_code(),
+            self._get_search_name())
+        self.initiate_event(StartRegionSearchEvent(
+            *self._search_filters, batch_size = _SEARCH_BATCH_SIZE,
+            generation = next(_search_generations), is_columnar = True))
+
+
     def _on_search_selection_changed(self, event):
-        if event.widget.curselection():
+        if self._search_list.selected_id() is not None:
             new_state = tkinter.NORMAL
         else:
             new_state = tkinter.DISABLED
@@ -197,13 +270,12 @@ class _RegionsSearchView(tkinter.LabelFrame, EventHandler):
 
     def on_event(self, event):
         if isinstance(event, ClearRegionsSearchListEvent):
-            self._search_list.delete(0, tkinter.END)
-            self._search_region_ids = []
+            self._search_list.clear()
             self._edit_button['state'] = tkinter.DISABLED
-        elif isinstance(event, RegionSearchResultEvent):
-            display_name = f'{event.region().region_code} - {event.region().name}'
-            self._search_list.insert(tkinter.END, display_name)
-            self._search_region_ids.append(event.region().region_id)
+        elif isinstance(event, RegionSearchResultColumnsEvent):
+            self._search_list.extend(event.columns())
+        elif isinstance(event, RegionSearchPageCompleteEvent):
+            self._search_list.complete_page(event.after_region_id())
 
 
 
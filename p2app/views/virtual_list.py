@@ -0,0 +1,288 @@
+# p2app/views/virtual_list.py
+#
+# ICS 33 Winter 2025
+# Project 2: Learning to Fly
+#
+# A scrolling list of search results that only gives tkinter the rows that are
+# visible, so that its memory and rendering time depend on the size of the window
+# rather than on how many results there are.
+#
+# Each row is a search result's ID, code, and name, kept in compact columns, and
+# shown as its code and name.  The list draws the visible rows into a listbox that
+# never holds more than a window's worth of them, formatting their text only when
+# they're drawn, and redraws it whenever the list is scrolled.
+#
+# A paged search's rows are kept a page at a time, and only a few pages are kept at
+# once: when the list is scrolled far from a page, that page's rows are dropped, and
+# they're asked for again (continuing after the same id as before) if the list is
+# scrolled back to them.  Rows whose page hasn't arrived yet are drawn blank.  When
+# a search has more results than have been sent so far, the list asks for them as
+# it's scrolled near the end, rather than needing a button to be clicked, and
+# asks only once per page, since a page's rows can arrive in several batches.  A
+# search that isn't paged can't be asked for again, so all of its rows are kept.
+#
+# Selecting a row generates a <<VirtualListSelect>> event.
+
+import bisect
+import tkinter
+import tkinter.font
+from p2app.events import SearchResultColumns
+
+
+
+# how many rows beyond the visible ones are drawn, so that a partially visible row
+# at the bottom is never left blank
+_MARGIN_ROWS = 2
+
+# how close to the last row the list can be scrolled before it asks for more rows
+_MORE_ROWS_THRESHOLD = 50
+
+# how many pages of a paged search are kept at once
+_MAX_KEPT_PAGES = 4
+
+
+
+class VirtualList(tkinter.Frame):
+    def __init__(self, parent, height, on_fetch_page = None):
+        super().__init__(parent)
+
+        self._first_row = 0
+        self._visible_rows = height
+        self._selected_row = None
+        self._selected_id = None
+        self._on_fetch_page = on_fetch_page
+        self._reset_pages()
+
+        self._listbox = tkinter.Listbox(
+            self, height = height, activestyle = tkinter.NONE, selectmode = tkinter.SINGLE,
+            exportselection = False)
+
+        self._listbox.grid(row = 0, column = 0, sticky = tkinter.NSEW)
+
+        self._scrollbar = tkinter.Scrollbar(
+            self, orient = tkinter.VERTICAL, command = self._on_scrollbar)
+
+        self._scrollbar.grid(row = 0, column = 1, sticky = tkinter.NS)
+
+        font = tkinter.font.Font(self, font = self._listbox['font'])
+        self._row_height = font.metrics('linespace') \
+            + 2 * self._listbox.winfo_pixels(self._listbox['selectborderwidth'])
+
+        self._listbox.bind('<<ListboxSelect>>', self._on_listbox_select)
+        self._listbox.bind('<Configure>', self._on_configure)
+        self._listbox.bind('<MouseWheel>', self._on_mouse_wheel)
+        self._listbox.bind('<Button-4>', lambda event: self._scroll_by(-3))
+        self._listbox.bind('<Button-5>', lambda event: self._scroll_by(3))
+        self._listbox.bind('<Up>', lambda event: self._move_selection(-1))
+        self._listbox.bind('<Down>', lambda event: self._move_selection(1))
+        self._listbox.bind('<Prior>', lambda event: self._scroll_by(-self._visible_rows))
+        self._listbox.bind('<Next>', lambda event: self._scroll_by(self._visible_rows))
+
+        self.rowconfigure(0, weight = 1)
+        self.columnconfigure(0, weight = 1)
+
+        self._render()
+
+
+    def clear(self):
+        self._first_row = 0
+        self._selected_row = None
+        self._selected_id = None
+        self._reset_pages()
+        self._render()
+
+
+    def extend(self, columns):
+        if self._loading_page is None:
+            return
+
+        self._pages[self._loading_page].extend(columns)
+
+        if self._loading_page == self._fetched_pages:
+            self._row_count += len(columns)
+
+        self._render()
+
+
+    def complete_page(self, after_id):
+        page = self._loading_page
+        self._loading_page = None
+
+        if page == self._fetched_pages:
+            self._fetched_pages += 1
+
+            if after_id is not None:
+                self._page_first_rows.append(self._row_count)
+                self._page_after_ids.append(after_id)
+
+        self._drop_distant_pages()
+        self._fetch_needed_page()
+
+
+    def row_count(self):
+        return self._row_count
+
+
+    def selected_id(self):
+        return self._selected_id
+
+
+    def _reset_pages(self):
+        # the search that was just started is loading its first page, which a search
+        # that isn't paged never finishes
+        self._pages = { 0: SearchResultColumns() }
+        self._page_first_rows = [ 0 ]
+        self._page_after_ids = [ None ]
+        self._fetched_pages = 0
+        self._loading_page = 0
+        self._row_count = 0
+
+
+    def _page_of(self, row):
+        return bisect.bisect_right(self._page_first_rows, row) - 1
+
+
+    def _locate(self, row):
+        page = self._page_of(row)
+        rows = self._pages.get(page)
+        index = row - self._page_first_rows[page]
+
+        if rows is not None and index < len(rows):
+            return rows, index
+        else:
+            return None, None
+
+
+    def _row_id(self, row):
+        rows, index = self._locate(row)
+        return rows.result_id(index) if rows is not None else None
+
+
+    def _row_text(self, row):
+        rows, index = self._locate(row)
+        return f'{rows.code(index)} - {rows.name(index)}' if rows is not None else ''
+
+
+    def _render(self):
+        last_row = min(self._first_row + self._visible_rows + _MARGIN_ROWS, self._row_count)
+
+        self._listbox.delete(0, tkinter.END)
+
+        if self._first_row < last_row:
+            self._listbox.insert(tkinter.END, *(
+                self._row_text(row) for row in range(self._first_row, last_row)))
+
+        if self._selected_row is not None and self._first_row <= self._selected_row < last_row:
+            self._listbox.selection_set(self._selected_row - self._first_row)
+
+        if self._row_count:
+            self._scrollbar.set(
+                self._first_row / self._row_count,
+                min(self._first_row + self._visible_rows, self._row_count) / self._row_count)
+        else:
+            self._scrollbar.set(0.0, 1.0)
+
+
+    def _scroll_to(self, first_row):
+        first_row = max(0, min(first_row, self._row_count - self._visible_rows))
+
+        if first_row != self._first_row:
+            self._first_row = first_row
+            self._render()
+
+        self._fetch_needed_page()
+
+
+    def _scroll_by(self, rows):
+        self._scroll_to(self._first_row + rows)
+        return 'break'
+
+
+    def _fetch_needed_page(self):
+        if self._loading_page is not None or not self._on_fetch_page:
+            return
+
+        last_row = min(self._first_row + self._visible_rows, self._row_count) - 1
+
+        for page in range(self._page_of(self._first_row), self._page_of(last_row) + 1):
+            if page not in self._pages:
+                self._fetch_page(page)
+                return
+
+        if len(self._page_after_ids) > self._fetched_pages \
+                and self._first_row + self._visible_rows + _MORE_ROWS_THRESHOLD >= self._row_count:
+            self._fetch_page(self._fetched_pages)
+
+
+    def _fetch_page(self, page):
+        self._pages[page] = SearchResultColumns()
+        self._loading_page = page
+        self._drop_distant_pages()
+        self._on_fetch_page(self._page_after_ids[page])
+
+
+    def _drop_distant_pages(self):
+        visible_page = self._page_of(self._first_row)
+
+        while len(self._pages) > _MAX_KEPT_PAGES:
+            distant_page = max(
+                (page for page in self._pages if page != self._loading_page),
+                key = lambda page: abs(page - visible_page))
+
+            del self._pages[distant_page]
+
+
+    def _on_scrollbar(self, action, amount, unit = None):
+        if action == tkinter.MOVETO:
+            self._scroll_to(round(float(amount) * self._row_count))
+        elif unit == tkinter.PAGES:
+            self._scroll_by(int(amount) * self._visible_rows)
+        else:
+            self._scroll_by(int(amount))
+
+
+    def _on_mouse_wheel(self, event):
+        return self._scroll_by(-3 if event.delta > 0 else 3)
+
+
+    def _on_configure(self, event):
+        self._visible_rows = max(1, event.height // self._row_height)
+        self._scroll_to(self._first_row)
+        self._render()
+
+
+    def _on_listbox_select(self, event):
+        selection = self._listbox.curselection()
+
+        if selection:
+            self._select(self._first_row + selection[0])
+        else:
+            self._select(None)
+
+        self.event_generate('<<VirtualListSelect>>')
+
+
+    def _select(self, row):
+        self._selected_row = row
+        self._selected_id = None if row is None else self._row_id(row)
+
+
+    def _move_selection(self, rows):
+        if not self._row_count:
+            return 'break'
+
+        if self._selected_row is None:
+            selected_row = self._first_row
+        else:
+            selected_row = max(0, min(self._selected_row + rows, self._row_count - 1))
+
+        self._select(selected_row)
+
+        if selected_row < self._first_row:
+            self._scroll_to(selected_row)
+        elif selected_row >= self._first_row + self._visible_rows:
+            self._scroll_to(selected_row - self._visible_rows + 1)
+
+        self._render()
+        self.event_generate('<<VirtualListSelect>>')
+        return 'break'
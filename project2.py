@@ -7,21 +7,32 @@
 #
 # YOU WILL NOT NEED TO MODIFY THIS FILE AT ALL
 
+import sys
+
 from p2app import EventBus
 from p2app import Engine
 from p2app import MainView
+from p2app.engine import ThreadedEngine
 
 
 def main():
+    is_threaded = '--threaded' in sys.argv[1:]
+
     event_bus = EventBus()
-    engine = Engine()
+    engine = ThreadedEngine() if is_threaded else Engine()
     main_view = MainView(event_bus)
 
-    event_bus.register_engine(engine)
+    event_bus.register_engine(engine, is_threaded)
     event_bus.register_view(main_view)
 
+    if is_threaded:
+        engine.start()
+
     main_view.run()
 
+    if is_threaded:
+        engine.stop()
+
 
 if __name__ == '__main__':
     main()
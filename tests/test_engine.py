@@ -1,10 +1,29 @@
+import asyncio
+import contextlib
+import io
+import json
+import os
 import pathlib
+import subprocess
+import sys
+import tempfile
 import sqlite3
+import time
+import tracemalloc
+import tkinter
 import unittest
 from contextlib import contextmanager
 
+import p2app.cli as cli
 import p2app.engine as engine
+import p2app.engine.async_engine as async_engine
+import p2app.engine.indexes as indexes
+import p2app.engine.queries as queries
+import p2app.engine.threaded as threaded
 import p2app.events as events
+import p2app.views.event_handling as event_handling
+import p2app.views.menus as menus
+import p2app.views.virtual_list as virtual_list
 
 
 DATABASE_FILENAME = "../airport.db"
@@ -677,6 +696,18 @@ class MyTestCase(unittest.TestCase):
                          "Failed to yield a region loaded event.")
         self.assertEqual(only_response.region(), region, "Failed to load the correct region.")
 
+    def test_do_not_load_region_with_missing_id(self):
+        MISSING_ID = 999999999
+
+        for _ in self._engine._handle_open_database(events.OpenDatabaseEvent(DATABASE_PATH)):
+            pass
+        post_process = self._engine._handle_load_region(events.LoadRegionEvent(MISSING_ID))
+
+        response = list(post_process)
+        self.assertEqual(len(response), 1, "Failed to only not load the region.")
+        self.assertEqual(type(response[0]), events.ErrorEvent,
+                         "Failed to yield an error event.")
+
     def test_save_new_region(self):
         REGION_ID = 999999
         REGION_CODE = "YY-99"
@@ -787,5 +818,1209 @@ class MyTestCase(unittest.TestCase):
         self.assertEqual(type(only_response), events.SaveRegionFailedEvent,
                          "Failed to yield a save region failed event.")
 
+    def test_search_regions_by_name_without_full_text_index(self):
+        REGION_1_ID = 303322
+        REGION_2_ID = 303335
+
+        plain_engine = engine.Engine(use_full_text_index = False)
+
+        for _ in plain_engine._handle_open_database(events.OpenDatabaseEvent(DATABASE_PATH)):
+            pass
+        post_process = plain_engine._handle_search_regions(
+            events.StartRegionSearchEvent("", "", "ouham"))
+
+        response = list(post_process)
+        self.assertEqual([ result.region().region_id for result in response ],
+                         [ REGION_1_ID, REGION_2_ID ],
+                         "Failed to find both regions without the full-text index.")
+
+    def test_full_text_index_follows_saved_regions(self):
+        REGION_ID = 999999
+        REGION_CODE = "YY-99"
+        LOCAL_CODE = "99"
+        NAME = "Zyxwvut Region"
+        MODIFIED_NAME = "Tuvwxyz Region"
+        CONTINENT_ID = 1
+        COUNTRY_ID = 302556
+
+        new_region = events.Region(REGION_ID, REGION_CODE, LOCAL_CODE, NAME, CONTINENT_ID,
+                                   COUNTRY_ID, None, None)
+        modified_region = new_region._replace(name = MODIFIED_NAME)
+        delete_region_injection = f"DELETE FROM region WHERE region_id = { REGION_ID };"
+
+        for _ in self._engine._handle_open_database(events.OpenDatabaseEvent(DATABASE_PATH)):
+            pass
+        for _ in self._engine._handle_save_new_region(events.SaveNewRegionEvent(new_region)):
+            pass
+
+        response = list(self._engine._handle_search_regions(
+            events.StartRegionSearchEvent("", "", "xwv")))
+        self.assertEqual(len(response), 1, "Failed to index the new region's name.")
+
+        for _ in self._engine._handle_save_region(events.SaveRegionEvent(modified_region)):
+            pass
+
+        response = list(self._engine._handle_search_regions(
+            events.StartRegionSearchEvent("", "", "xwv")))
+        self.assertEqual(len(response), 0, "Failed to drop the old name from the index.")
+
+        self._engine._connection.execute(delete_region_injection)
+        self._engine._connection.commit()
+
+        response = list(self._engine._handle_search_regions(
+            events.StartRegionSearchEvent("", "", "vwx")))
+        self.assertEqual(len(response), 0, "Failed to drop the deleted region from the index.")
+
+    def test_search_short_names_without_full_text_index(self):
+        for _ in self._engine._handle_open_database(events.OpenDatabaseEvent(DATABASE_PATH)):
+            pass
+
+        for name, uses_index in [ ("ou", False), ("o%u", False), ("ouh", True) ]:
+            query, parameters = queries.build_search(
+                "region", { "name": name }, True, page_size = 10, is_listing = True)
+            cursor = self._engine._connection.execute(f"EXPLAIN QUERY PLAN { query }", parameters)
+            plan = " ".join(detail for _, _, _, detail in cursor)
+            cursor.close()
+
+            self.assertEqual("region_fts" in plan, uses_index,
+                             f"Failed to choose whether to search for { name !r} by index.")
+
+        response = list(self._engine._handle_search_regions(
+            events.StartRegionSearchEvent("", "", "ou")))
+        self.assertIn(303322, [ result.region().region_id for result in response ],
+                      "Failed to find a region by a short name.")
+
+    def test_compile_one_query_per_filter_combination(self):
+        query, parameters = queries.build_search(
+            "region", { "region_code": "AD-02", "local_code": None, "name": "Canillo" }, False)
+        same_query, _ = queries.build_search(
+            "region", { "region_code": "CF-AC", "local_code": "", "name": "Ouham" }, False)
+
+        self.assertIs(query, same_query, "Failed to reuse the compiled query.")
+        self.assertEqual(query, "SELECT * FROM region"
+                                " WHERE region_code = :region_code AND name LIKE :formatted_name",
+                         "Failed to compile the correct query.")
+        self.assertEqual(parameters, { "region_code": "AD-02", "formatted_name": "%Canillo%" },
+                         "Failed to build the correct parameters.")
+
+    def test_report_compiled_search_statistics(self):
+        post_process = self._engine._handle_statistics(events.EngineStatisticsRequestedEvent())
+
+        response = list(post_process)
+        self.assertEqual(len(response), 1, "Failed to only report statistics.")
+        self.assertEqual(type(response[0]), events.EngineStatisticsEvent,
+                         "Failed to yield an engine statistics event.")
+        self.assertIn("compiled_search_hit_rate", response[0].statistics(),
+                      "Failed to report the compiled search hit rate.")
+
+    def test_search_regions_one_page_at_a_time(self):
+        REGION_1_ID = 303322
+        REGION_2_ID = 303335
+        PAGE_SIZE = 1
+
+        for _ in self._engine._handle_open_database(events.OpenDatabaseEvent(DATABASE_PATH)):
+            pass
+        post_process = self._engine._handle_search_regions(
+            events.StartRegionSearchEvent("", "", "Ouham", PAGE_SIZE))
+
+        first_result, first_page_complete = list(post_process)
+        self.assertEqual(first_result.region().region_id, REGION_1_ID,
+                         "Failed to find the first page's region.")
+        self.assertEqual(type(first_page_complete), events.RegionSearchPageCompleteEvent,
+                         "Failed to yield a page complete event.")
+        self.assertTrue(first_page_complete.has_more(), "Failed to report a second page.")
+
+        post_process = self._engine._handle_search_regions(
+            events.StartRegionSearchEvent("", "", "Ouham", PAGE_SIZE,
+                                          first_page_complete.after_region_id()))
+
+        second_result, second_page_complete = list(post_process)
+        self.assertEqual(second_result.region().region_id, REGION_2_ID,
+                         "Failed to find the second page's region.")
+        self.assertFalse(second_page_complete.has_more(), "Reported a non-existent third page.")
+
+    def test_search_regions_in_batches(self):
+        REGION_1_ID = 303322
+        REGION_2_ID = 303335
+        BATCH_SIZE = 500
+
+        for _ in self._engine._handle_open_database(events.OpenDatabaseEvent(DATABASE_PATH)):
+            pass
+        post_process = self._engine._handle_search_regions(
+            events.StartRegionSearchEvent("", "", "Ouham", batch_size = BATCH_SIZE))
+
+        response = list(post_process)
+        self.assertEqual(len(response), 1, "Failed to yield exactly one batch.")
+        only_response = response[0]
+        self.assertEqual(type(only_response), events.RegionSearchResultBatchEvent,
+                         "Failed to yield a region result batch.")
+        self.assertEqual([ region.region_id for region in only_response.regions() ],
+                         [ REGION_1_ID, REGION_2_ID ], "Failed to batch both regions.")
+
+    def test_provision_indexes_for_exact_code_searches(self):
+        LOCAL_CODE = "AC"
+
+        for _ in self._engine._handle_open_database(events.OpenDatabaseEvent(DATABASE_PATH)):
+            pass
+
+        query, parameters = queries.build_search("region", { "local_code": LOCAL_CODE }, False)
+        cursor = self._engine._connection.execute(f"EXPLAIN QUERY PLAN { query }", parameters)
+        plan = " ".join(detail for _, _, _, detail in cursor)
+        cursor.close()
+
+        self.assertIn("USING INDEX", plan, "Failed to search local codes with an index.")
+
+    def test_report_missing_indexes_on_read_only_database(self):
+        connection = sqlite3.connect(":memory:")
+        connection.execute("CREATE TABLE continent (continent_id INTEGER PRIMARY KEY,"
+                           "                        continent_code TEXT, name TEXT)")
+        connection.execute("PRAGMA query_only = ON")
+
+        created, missing = indexes.provision_indexes(connection)
+
+        self.assertEqual(created, [], "Created an index on a read-only database.")
+        self.assertIn(indexes.index_name("continent", ("continent_code", "name")), missing,
+                      "Failed to report the missing continent code index.")
+        connection.close()
+
+    def test_load_region_from_cache(self):
+        REGION_ID = 303322
+        MODIFIED_NAME = "Modified Ouham"
+
+        cached_engine = engine.Engine()
+
+        for _ in cached_engine._handle_open_database(events.OpenDatabaseEvent(DATABASE_PATH)):
+            pass
+        region, = [ response.region() for response in
+                    cached_engine._handle_load_region(events.LoadRegionEvent(REGION_ID)) ]
+        cached_region, = [ response.region() for response in
+                           cached_engine._handle_load_region(events.LoadRegionEvent(REGION_ID)) ]
+
+        self.assertEqual(cached_region, region, "Failed to load the same region from the cache.")
+        statistics = cached_engine._statistics()
+        self.assertEqual(statistics["record_cache_hits"], 1, "Failed to hit the record cache.")
+        self.assertEqual(statistics["record_cache_misses"], 1, "Failed to miss the record cache.")
+
+        modified_region = region._replace(name = MODIFIED_NAME)
+        for _ in cached_engine._handle_save_region(events.SaveRegionEvent(modified_region)):
+            pass
+        saved_region, = [ response.region() for response in
+                          cached_engine._handle_load_region(events.LoadRegionEvent(REGION_ID)) ]
+
+        self.assertEqual(saved_region, modified_region, "Failed to write the save through.")
+
+        for _ in cached_engine._handle_save_region(events.SaveRegionEvent(region)):
+            pass
+        for _ in cached_engine._handle_close_database(events.CloseDatabaseEvent()):
+            pass
+
+        self.assertEqual(cached_engine._statistics()["record_cache_size"], 0,
+                         "Failed to clear the record cache on close.")
+
+    def test_invalidate_only_searches_a_saved_region_could_match(self):
+        REGION_ID = 303322
+        MODIFIED_NAME = "Modified Ouham"
+
+        cached_engine = engine.Engine()
+
+        for _ in cached_engine._handle_open_database(events.OpenDatabaseEvent(DATABASE_PATH)):
+            pass
+        for search in (events.StartRegionSearchEvent("", "", "ouham"),
+                       events.StartRegionSearchEvent("AD-02", "", ""),
+                       events.StartRegionSearchEvent("", "", "OUHAM")):
+            for _ in cached_engine._handle_search_regions(search):
+                pass
+
+        statistics = cached_engine._statistics()
+        self.assertEqual(statistics["search_cache_entries"], 2,
+                         "Failed to cache each normalized search once.")
+        self.assertEqual(statistics["search_cache_hits"], 1,
+                         "Failed to find the normalized search in the cache.")
+
+        region, = [ response.region() for response in
+                    cached_engine._handle_load_region(events.LoadRegionEvent(REGION_ID)) ]
+        for _ in cached_engine._handle_save_region(
+                events.SaveRegionEvent(region._replace(name = MODIFIED_NAME))):
+            pass
+
+        self.assertEqual(cached_engine._statistics()["search_cache_entries"], 1,
+                         "Failed to invalidate only the search matching the saved region.")
+
+        response = list(cached_engine._handle_search_regions(
+            events.StartRegionSearchEvent("", "", "Modified Ouham")))
+        self.assertEqual(len(response), 1, "Failed to find the saved region.")
+
+        for _ in cached_engine._handle_save_region(events.SaveRegionEvent(region)):
+            pass
+
+    def test_open_database_snapshot(self):
+        REGION_ID = 303322
+        MODIFIED_NAME = "Modified Ouham"
+
+        snapshot_engine = engine.Engine()
+
+        response = list(snapshot_engine._handle_open_database(
+            events.OpenDatabaseEvent(DATABASE_PATH, is_snapshot = True)))
+        self.assertEqual(len(response), 1, "Failed to only open the snapshot.")
+        only_response = response[0]
+        self.assertEqual(type(only_response), events.DatabaseOpenedEvent,
+                         "Failed to open the snapshot.")
+        self.assertTrue(only_response.is_snapshot(), "Failed to report the snapshot.")
+        self.assertGreater(only_response.snapshot_size(), 0, "Failed to report the snapshot size.")
+
+        region, = [ response.region() for response in
+                    snapshot_engine._handle_load_region(events.LoadRegionEvent(REGION_ID)) ]
+        for _ in snapshot_engine._handle_save_region(
+                events.SaveRegionEvent(region._replace(name = MODIFIED_NAME))):
+            pass
+
+        disk_connection = sqlite3.connect(DATABASE_PATH)
+        disk_name, = disk_connection.execute(
+            "SELECT name FROM region WHERE region_id = :id", { "id": REGION_ID }).fetchone()
+        disk_connection.close()
+        self.assertEqual(disk_name, MODIFIED_NAME, "Failed to write through to the file.")
+
+        for _ in snapshot_engine._handle_save_region(events.SaveRegionEvent(region)):
+            pass
+        for _ in snapshot_engine._handle_close_database(events.CloseDatabaseEvent()):
+            pass
+
+    def test_snapshot_is_unchanged_when_its_file_cannot_be_written(self):
+        REGION_ID = 303322
+        MODIFIED_NAME = "Modified Ouham"
+
+        snapshot_engine = engine.Engine()
+
+        try:
+            for _ in snapshot_engine.process_event(
+                    events.OpenDatabaseEvent(DATABASE_PATH, is_snapshot = True)):
+                pass
+            region, = [ response.region() for response in
+                        snapshot_engine.process_event(events.LoadRegionEvent(REGION_ID)) ]
+
+            snapshot_engine._disk_connection.execute("PRAGMA query_only = ON")
+
+            response = list(snapshot_engine.process_event(
+                events.SaveRegionEvent(region._replace(name = MODIFIED_NAME))))
+            names = [ name for name, in snapshot_engine._connection.execute(
+                "SELECT name FROM region WHERE region_id = :id", { "id": REGION_ID }) ]
+        finally:
+            snapshot_engine.close()
+
+        self.assertEqual(type(response[0]), events.SaveRegionFailedEvent,
+                         "Failed to report that the file couldn't be written.")
+        self.assertEqual(names, [ region.name ], "Changed the snapshot without its file.")
+
+    def test_open_database_with_performance_profile(self):
+        PROFILE = "interactive"
+
+        profiled_engine = engine.Engine()
+
+        response = list(profiled_engine._handle_open_database(
+            events.OpenDatabaseEvent(DATABASE_PATH, profile = PROFILE)))
+        self.assertEqual(len(response), 1, "Failed to only open the database.")
+        pragmas = response[0].pragmas()
+        self.assertEqual(pragmas["journal_mode"], "wal", "Failed to switch to write-ahead logging.")
+        self.assertEqual(pragmas["busy_timeout"], 5000, "Failed to apply the busy timeout.")
+
+        profiled_engine._connection.execute("PRAGMA journal_mode = DELETE")
+        for _ in profiled_engine._handle_close_database(events.CloseDatabaseEvent()):
+            pass
+
+    def test_open_shared_database_without_writing_to_it(self):
+        PROFILE = "read-only-share"
+        TABLES = ("continent", "country", "region")
+
+        source = sqlite3.connect(DATABASE_PATH)
+        schema = [ sql for sql, in source.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name IN (?, ?, ?)", TABLES) ]
+        source.close()
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = pathlib.Path(directory) / "shared.db"
+
+            connection = sqlite3.connect(path)
+            for sql in schema:
+                connection.execute(sql)
+            connection.commit()
+            connection.close()
+
+            contents = path.read_bytes()
+            shared_engine = engine.Engine()
+
+            try:
+                response = list(shared_engine._handle_open_database(
+                    events.OpenDatabaseEvent(path, profile = PROFILE)))
+                searched = list(shared_engine._handle_search_regions(
+                    events.StartRegionSearchEvent(None, None, "ouham")))
+            finally:
+                shared_engine.close()
+
+            self.assertEqual(type(response[0]), events.DatabaseOpenedEvent,
+                             "Failed to open the shared database.")
+            self.assertEqual(response[0].pragmas()["query_only"], 1,
+                             "Failed to allow only queries.")
+            self.assertIn(indexes.index_name("region", ("country_id",)),
+                          response[0].missing_indexes(), "Failed to report the missing index.")
+            self.assertEqual(searched, [], "Failed to search the shared database.")
+            self.assertEqual(path.read_bytes(), contents, "Wrote to the shared database.")
+
+    def test_saves_fail_on_shared_database(self):
+        PROFILE = "read-only-share"
+        REGION_ID = 303322
+        NEW_REGION_ID = 400020
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = pathlib.Path(directory) / "shared.db"
+
+            source = sqlite3.connect(DATABASE_PATH)
+            copy = sqlite3.connect(path)
+            source.backup(copy)
+            copy.close()
+            source.close()
+
+            shared_engine = engine.Engine()
+
+            try:
+                for _ in shared_engine.process_event(
+                        events.OpenDatabaseEvent(path, profile = PROFILE)):
+                    pass
+                region, = [ response.region() for response in
+                            shared_engine.process_event(events.LoadRegionEvent(REGION_ID)) ]
+
+                edited = list(shared_engine.process_event(
+                    events.SaveRegionEvent(region._replace(name = "Shared Ouham"))))
+                added = list(shared_engine.process_event(events.SaveNewRegionEvent(
+                    region._replace(region_id = NEW_REGION_ID, region_code = "CF-SH"))))
+            finally:
+                shared_engine.close()
+
+        self.assertEqual([ type(response) for response in edited ],
+                         [ events.SaveRegionFailedEvent ], "Failed to report the failed edit.")
+        self.assertEqual([ type(response) for response in added ],
+                         [ events.SaveRegionFailedEvent ], "Failed to report the failed insert.")
+
+    def test_cannot_open_database_with_unknown_profile(self):
+        post_process = self._engine._handle_open_database(
+            events.OpenDatabaseEvent(DATABASE_PATH, profile = "non-existent"))
+        self.assertEqual(type(next(post_process)), events.DatabaseOpenFailedEvent,
+                         "Opened a database with an unknown profile.")
+
+    def test_group_commit_saved_regions(self):
+        REGION_ID = 303322
+        MODIFIED_NAME = "Modified Ouham"
+        GROUP_COMMIT_ROWS = 2
+        GROUP_COMMIT_SECONDS = 60.0
+
+        grouping_engine = engine.Engine(group_commit_rows = GROUP_COMMIT_ROWS,
+                                        group_commit_seconds = GROUP_COMMIT_SECONDS)
+
+        for _ in grouping_engine.process_event(events.OpenDatabaseEvent(DATABASE_PATH)):
+            pass
+        region, = [ response.region() for response in
+                    grouping_engine.process_event(events.LoadRegionEvent(REGION_ID)) ]
+
+        response = list(grouping_engine.process_event(
+            events.SaveRegionEvent(region._replace(name = MODIFIED_NAME))))
+        self.assertEqual(type(response[-1]), events.PendingWritesEvent,
+                         "Failed to report the pending write.")
+        self.assertEqual(response[-1].count(), 1, "Failed to hold back the first write.")
+        self.assertTrue(grouping_engine._connection.in_transaction,
+                        "Committed the first write on its own.")
+
+        response = list(grouping_engine.process_event(events.SaveRegionEvent(region)))
+        self.assertEqual(response[-1].count(), 0, "Failed to commit both writes together.")
+        self.assertFalse(grouping_engine._connection.in_transaction,
+                         "Failed to commit once the row threshold was reached.")
+
+        for _ in grouping_engine.process_event(
+                events.SaveRegionEvent(region._replace(name = MODIFIED_NAME))):
+            pass
+        response = list(grouping_engine.process_event(events.FlushWritesEvent()))
+        self.assertEqual(response[-1].count(), 0, "Failed to flush the pending write.")
+
+        for _ in grouping_engine.process_event(events.SaveRegionEvent(region)):
+            pass
+        for _ in grouping_engine.process_event(events.CloseDatabaseEvent()):
+            pass
+
+    def test_file_menu_flushes_pending_writes_after_a_while(self):
+        initiated = []
+
+        class Root(tkinter.Tk):
+            def event_routes(self):
+                return routes
+
+            def initiate_event(self, event):
+                initiated.append(event)
+
+        routes = event_handling.EventRoutes()
+
+        try:
+            root = Root()
+        except tkinter.TclError:
+            self.skipTest("No display is available.")
+
+        try:
+            file_menu = menus.FileMenu(root)
+
+            routes.route(events.PendingWritesEvent(1))
+            first_flush_id = file_menu._flush_id
+            routes.route(events.PendingWritesEvent(2))
+            is_rescheduled = file_menu._flush_id != first_flush_id
+            file_menu._on_flush_due()
+
+            routes.route(events.PendingWritesEvent(1))
+            routes.route(events.PendingWritesEvent(0))
+            cancelled_flush_id = file_menu._flush_id
+        finally:
+            root.destroy()
+
+        self.assertIsNotNone(first_flush_id, "Failed to schedule a flush of the pending writes.")
+        self.assertFalse(is_rescheduled, "Put off the flush as more writes became pending.")
+        self.assertEqual([ type(event) for event in initiated ], [ events.FlushWritesEvent ],
+                         "Failed to flush the pending writes once they were due.")
+        self.assertIsNone(cancelled_flush_id, "Failed to cancel the flush once nothing was pending.")
+
+    def test_import_regions_from_csv(self):
+        CSV_TEXT = ("region_id,region_code,local_code,name,continent_id,country_id,"
+                    "wikipedia_link,keywords\n"
+                    "400001,US-IM1,IM1,Imported One,5,302755,,\n"
+                    "400002,US-IM2,IM2,,5,302755,,\n"
+                    "400003,US-IM3,IM3,Imported Three,five,302755,,\n"
+                    "400004,US-IM1,IM4,Duplicated Code,5,302755,,\n"
+                    "400005,US-IM5,IM5,Imported Five,5,302755,,\n")
+        IMPORTED_NAME = "imported"
+
+        for _ in self._engine.process_event(events.OpenDatabaseEvent(DATABASE_PATH)):
+            pass
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = pathlib.Path(directory) / "regions.csv"
+            path.write_text(CSV_TEXT, encoding = "utf-8")
+
+            response = list(self._engine.process_event(
+                events.StartImportEvent("region", path, chunk_size = 2, transaction_size = 2)))
+
+        completed = response[-1]
+        self.assertEqual(type(completed), events.ImportCompletedEvent, "Failed to import.")
+        self.assertEqual(completed.imported(), 2, "Failed to import the valid regions.")
+        self.assertEqual([ line for line, _ in completed.rejections() ], [3, 4, 5],
+                         "Failed to reject the invalid and duplicated regions.")
+        self.assertIn(events.ImportProgressEvent, map(type, response),
+                      "Failed to report progress.")
+
+        names = [ response.region().name for response in self._engine.process_event(
+            events.StartRegionSearchEvent(None, None, IMPORTED_NAME)) ]
+        self.assertEqual(names, ["Imported One", "Imported Five"],
+                         "Failed to search the imported regions by name.")
+
+        self._engine._connection.execute("DELETE FROM region WHERE region_id > 400000")
+        self._engine._connection.commit()
+
+    def test_reject_imported_regions_with_values_of_the_wrong_type(self):
+        GOOD_REGION = { "region_id": 400001, "region_code": "US-IM1", "local_code": "IM1",
+                        "name": "Imported One", "continent_id": 5, "country_id": 302755 }
+        RECORDS = [
+            GOOD_REGION,
+            GOOD_REGION | { "region_id": 400002, "region_code": "US-IM2", "name": ["x"] },
+            GOOD_REGION | { "region_id": 400003, "region_code": "US-IM3", "continent_id": 1.7 },
+            GOOD_REGION | { "region_id": 400004, "region_code": "US-IM4", "continent_id": True },
+            GOOD_REGION | { "region_id": 400005, "region_code": "US-IM5", "keywords": {} },
+            GOOD_REGION | { "region_id": 400006, "region_code": "US-IM6", "continent_id": 5.0 }
+        ]
+
+        for _ in self._engine.process_event(events.OpenDatabaseEvent(DATABASE_PATH)):
+            pass
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = pathlib.Path(directory) / "regions.jsonl"
+            path.write_text("".join(json.dumps(record) + "\n" for record in RECORDS),
+                            encoding = "utf-8")
+
+            response = list(self._engine.process_event(events.StartImportEvent("region", path)))
+
+        imported_ids = [ region_id for region_id, in self._engine._connection.execute(
+            "SELECT region_id FROM region WHERE region_id > 400000 ORDER BY region_id") ]
+
+        self._engine._connection.execute("DELETE FROM region WHERE region_id > 400000")
+        self._engine._connection.commit()
+
+        completed = response[-1]
+        self.assertEqual(type(completed), events.ImportCompletedEvent, "Failed to import.")
+        self.assertEqual(imported_ids, [ 400001, 400006 ], "Failed to import the valid regions.")
+        self.assertEqual([ line for line, _ in completed.rejections() ], [2, 3, 4, 5],
+                         "Failed to reject the regions with values of the wrong type.")
+
+    def test_cannot_import_unknown_format(self):
+        for _ in self._engine.process_event(events.OpenDatabaseEvent(DATABASE_PATH)):
+            pass
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = pathlib.Path(directory) / "regions.xml"
+            path.write_text("<regions/>", encoding = "utf-8")
+
+            response = list(self._engine.process_event(events.StartImportEvent("region", path)))
+
+        self.assertEqual(type(response[-1]), events.ImportFailedEvent,
+                         "Imported a file of an unknown format.")
+
+    def test_export_regions_to_jsonl(self):
+        NAME = "ouham"
+        EXPECTED_REGION_IDS = [303322, 303335]
+
+        for _ in self._engine.process_event(events.OpenDatabaseEvent(DATABASE_PATH)):
+            pass
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = pathlib.Path(directory) / "regions.jsonl"
+
+            response = list(self._engine.process_event(events.StartExportEvent(
+                events.StartRegionSearchEvent(None, None, NAME), path, fetch_size = 1)))
+
+            with open(path, encoding = "utf-8") as file:
+                exported = [ json.loads(line) for line in file ]
+
+        self.assertEqual(type(response[-1]), events.ExportCompletedEvent, "Failed to export.")
+        self.assertEqual(response[-1].exported(), len(EXPECTED_REGION_IDS),
+                         "Failed to count the exported regions.")
+        self.assertEqual([ region["region_id"] for region in exported ], EXPECTED_REGION_IDS,
+                         "Failed to export the regions the search finds.")
+
+    def test_save_region_without_selecting_it_first(self):
+        REGION_ID = 305446
+        MODIFIED_NAME = "Modified Brezica"
+
+        for _ in self._engine.process_event(events.OpenDatabaseEvent(DATABASE_PATH)):
+            pass
+        region, = [ response.region() for response in
+                    self._engine.process_event(events.LoadRegionEvent(REGION_ID)) ]
+
+        statements = []
+        self._engine._connection.set_trace_callback(statements.append)
+
+        for _ in self._engine.process_event(
+                events.SaveRegionEvent(region._replace(name = MODIFIED_NAME))):
+            pass
+
+        self._engine._connection.set_trace_callback(None)
+
+        for _ in self._engine.process_event(events.SaveRegionEvent(region)):
+            pass
+
+        self.assertFalse(any("SELECT * FROM region" in statement for statement in statements),
+                         "Selected the region before updating it.")
+
+    def test_upsert_regions_from_jsonl(self):
+        REGION_ID = 303322
+        UPSERTED_NAME = "Upserted Ouham"
+        NEW_REGION_ID = 400010
+
+        for _ in self._engine.process_event(events.OpenDatabaseEvent(DATABASE_PATH)):
+            pass
+        region, = [ response.region() for response in
+                    self._engine.process_event(events.LoadRegionEvent(REGION_ID)) ]
+        new_region = region._replace(region_id = NEW_REGION_ID, region_code = "CF-UP")
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = pathlib.Path(directory) / "regions.jsonl"
+            path.write_text(
+                json.dumps(region._replace(name = UPSERTED_NAME)._asdict()) + "\n"
+                + json.dumps(new_region._asdict()) + "\n", encoding = "utf-8")
+
+            response = list(self._engine.process_event(
+                events.StartImportEvent("region", path, is_upsert = True)))
+
+        self.assertEqual(response[-1].imported(), 2, "Failed to upsert both regions.")
+
+        upserted, = [ response.region() for response in
+                      self._engine.process_event(events.LoadRegionEvent(REGION_ID)) ]
+        self.assertEqual(upserted.name, UPSERTED_NAME, "Failed to update the existing region.")
+
+        for _ in self._engine.process_event(events.SaveRegionEvent(region)):
+            pass
+        self._engine._connection.execute("DELETE FROM region WHERE region_id = :id",
+                                         { "id": NEW_REGION_ID })
+        self._engine._connection.commit()
+
+    def test_skip_saving_unchanged_region(self):
+        REGION_ID = 303335
+        MODIFIED_NAME = "Modified Ouham-Pendé"
+
+        for _ in self._engine.process_event(events.OpenDatabaseEvent(DATABASE_PATH)):
+            pass
+        region, = [ response.region() for response in
+                    self._engine.process_event(events.LoadRegionEvent(REGION_ID)) ]
+        avoided_writes = self._engine._statistics()["avoided_writes"]
+
+        statements = []
+        self._engine._connection.set_trace_callback(statements.append)
+
+        response = list(self._engine.process_event(events.SaveRegionEvent(region)))
+        unchanged_statements = list(statements)
+
+        statements.clear()
+        for _ in self._engine.process_event(
+                events.SaveRegionEvent(region._replace(name = MODIFIED_NAME))):
+            pass
+        changed_updates = [ statement for statement in statements
+                            if statement.startswith("UPDATE region") ]
+
+        self._engine._connection.set_trace_callback(None)
+
+        for _ in self._engine.process_event(events.SaveRegionEvent(region)):
+            pass
+
+        self.assertEqual(type(response[0]), events.RegionSavedEvent,
+                         "Failed to save the unchanged region.")
+        self.assertEqual(unchanged_statements, [], "Wrote the unchanged region.")
+        self.assertEqual(self._engine._statistics()["avoided_writes"], avoided_writes + 1,
+                         "Failed to count the avoided write.")
+        self.assertTrue(changed_updates[0].startswith("UPDATE region SET name = "),
+                        "Failed to update only the changed column.")
+
+    def test_skip_saving_unchanged_region_with_empty_keywords(self):
+        REGION_ID = 310001
+
+        for _ in self._engine.process_event(events.OpenDatabaseEvent(DATABASE_PATH)):
+            pass
+        region, = [ response.region() for response in
+                    self._engine.process_event(events.LoadRegionEvent(REGION_ID)) ]
+        avoided_writes = self._engine._statistics()["avoided_writes"]
+
+        # the user interface sends empty text for the empty columns that are NULL
+        edited_region = region._replace(wikipedia_link = region.wikipedia_link or "",
+                                        keywords = region.keywords or "")
+
+        statements = []
+        self._engine._connection.set_trace_callback(statements.append)
+
+        response = list(self._engine.process_event(events.SaveRegionEvent(edited_region)))
+
+        self._engine._connection.set_trace_callback(None)
+
+        self.assertIsNone(region.keywords, "Failed to load a region without keywords.")
+        self.assertEqual(type(response[0]), events.RegionSavedEvent,
+                         "Failed to save the unchanged region.")
+        self.assertEqual(statements, [], "Wrote the unchanged region.")
+        self.assertEqual(self._engine._statistics()["avoided_writes"], avoided_writes + 1,
+                         "Failed to count the avoided write.")
+
+    def test_threaded_engine_preserves_order(self):
+        FIRST_NAME = "ouham"
+        SECOND_CODE = "AD-02"
+
+        threaded_engine = engine.ThreadedEngine()
+        threaded_engine.start()
+
+        threaded_engine.submit(events.OpenDatabaseEvent(DATABASE_PATH))
+        threaded_engine.submit(events.StartRegionSearchEvent(None, None, FIRST_NAME))
+        threaded_engine.submit(events.StartRegionSearchEvent(SECOND_CODE, None, None))
+        threaded_engine.stop()
+
+        response = list(threaded_engine.completed_events())
+
+        self.assertEqual(type(response[0]), events.DatabaseOpenedEvent,
+                         "Failed to open the database first.")
+        self.assertEqual([ event.region().region_code for event in response[1:] ],
+                         ["CF-AC", "CF-OP", SECOND_CODE],
+                         "Failed to deliver the results in the order they were requested.")
+
+    def test_async_engine_serves_concurrent_searches(self):
+        OUHAM_NAME = "ouham"
+
+        async def search(async_engine, name):
+            return [ event async for event in async_engine.process_event(
+                events.StartRegionSearchEvent(None, None, name)) ]
+
+        async def serve():
+            async with engine.AsyncEngine() as async_engine:
+                async for _ in async_engine.process_event(events.OpenDatabaseEvent(DATABASE_PATH)):
+                    pass
+
+                return await asyncio.gather(
+                    search(async_engine, None), search(async_engine, OUHAM_NAME))
+
+        every_region, ouhams = asyncio.run(serve())
+
+        connection = sqlite3.connect(DATABASE_PATH)
+        region_count, = connection.execute("SELECT COUNT(*) FROM region").fetchone()
+        connection.close()
+
+        self.assertEqual(len(every_region), region_count, "Failed to find every region.")
+        self.assertEqual([ event.region().name for event in ouhams ], ["Ouham", "Ouham-Pendé"],
+                         "Failed to find the regions named Ouham.")
+
+    def test_newer_search_cancels_older_search(self):
+        MISSING_NAME = "no region has this name"
+
+        cancelling_engine = engine.Engine(use_full_text_index = False)
+
+        for _ in cancelling_engine.process_event(events.OpenDatabaseEvent(DATABASE_PATH)):
+            pass
+
+        older_search = cancelling_engine.process_event(
+            events.StartRegionSearchEvent(None, None, None, batch_size = 1, generation = 1))
+        first_response = next(older_search)
+
+        cancelling_engine.cancel_older_searches(
+            events.StartRegionSearchEvent(None, None, MISSING_NAME, generation = 2))
+
+        self.assertEqual(list(older_search), [], "Failed to stop the cancelled search.")
+        self.assertTrue(cancelling_engine.is_stale(first_response),
+                        "Failed to mark the cancelled search's results as stale.")
+
+        interrupted_search = cancelling_engine.process_event(
+            events.StartRegionSearchEvent(None, None, MISSING_NAME, generation = 1))
+
+        self.assertEqual(list(interrupted_search), [], "Found a region that doesn't exist.")
+        self.assertEqual(cancelling_engine._statistics()["search_cache_entries"], 0,
+                         "Failed to interrupt the cancelled search before it finished.")
+
+        for _ in cancelling_engine.process_event(events.CloseDatabaseEvent()):
+            pass
+
+    def test_narrow_cached_search_as_name_is_extended(self):
+        BROADER_NAME = "ouh"
+        NARROWER_NAME = "ouham-"
+
+        narrowing_engine = engine.Engine()
+
+        for _ in narrowing_engine.process_event(events.OpenDatabaseEvent(DATABASE_PATH)):
+            pass
+        for _ in narrowing_engine.process_event(
+                events.StartRegionSearchEvent(None, None, BROADER_NAME)):
+            pass
+
+        statements = []
+        narrowing_engine._connection.set_trace_callback(statements.append)
+
+        names = [ response.region().name for response in narrowing_engine.process_event(
+            events.StartRegionSearchEvent(None, None, NARROWER_NAME)) ]
+
+        narrowing_engine._connection.set_trace_callback(None)
+
+        self.assertEqual(names, ["Ouham-Pendé"], "Failed to narrow the search correctly.")
+        self.assertEqual(statements, [], "Searched the database instead of narrowing.")
+        self.assertEqual(narrowing_engine._statistics()["search_cache_narrowed"], 1,
+                         "Failed to count the narrowed search.")
+
+        for _ in narrowing_engine.process_event(events.CloseDatabaseEvent()):
+            pass
+
+    def test_narrow_search_too_large_to_cache(self):
+        BROADER_NAME = "ou"
+        NARROWER_NAME = "ouham"
+
+        # the broader search's rows don't fit in the search cache, only in compact rows
+        narrowing_engine = engine.Engine(search_cache_budget = 1000)
+
+        def listed_names(name):
+            return [ (columns.result_id(row), columns.name(row))
+                     for response in narrowing_engine.process_event(
+                         events.StartRegionSearchEvent(None, None, name, is_columnar = True))
+                     for columns in [ response.columns() ] for row in range(len(columns)) ]
+
+        for _ in narrowing_engine.process_event(events.OpenDatabaseEvent(DATABASE_PATH)):
+            pass
+
+        broader_names = listed_names(BROADER_NAME)
+        statistics = narrowing_engine._statistics()
+
+        statements = []
+        narrowing_engine._connection.set_trace_callback(statements.append)
+
+        narrower_names = listed_names(NARROWER_NAME)
+
+        narrowing_engine._connection.set_trace_callback(None)
+        narrowing_engine.close()
+
+        self.assertEqual(statistics["search_cache_entries"], 0,
+                         "Cached a search larger than the budget.")
+        self.assertEqual(statistics["search_cache_compact_entries"], 1,
+                         "Failed to keep the large search as compact rows.")
+        self.assertEqual(statements, [], "Searched the database instead of narrowing.")
+        self.assertEqual(narrower_names,
+                         [ (region_id, name) for region_id, name in broader_names
+                           if NARROWER_NAME in name.lower() ],
+                         "Failed to narrow the search correctly.")
+        self.assertIn((303322, "Ouham"), narrower_names, "Failed to find the region.")
+
+    def test_headless_search_prints_jsonl(self):
+        NAME = "ouham"
+
+        output = io.StringIO()
+
+        with contextlib.redirect_stdout(output):
+            status = cli.main(["search", str(DATABASE_PATH), "region", "--name", NAME])
+
+        responses = [ json.loads(line) for line in output.getvalue().splitlines() ]
+
+        self.assertEqual(status, 0, "Failed to run the search.")
+        self.assertEqual([ response["event"] for response in responses ],
+                         ["RegionSearchResultEvent", "RegionSearchResultEvent"],
+                         "Failed to print one line per result.")
+        self.assertEqual(responses[0]["region"]["region_code"], "CF-AC",
+                         "Failed to print the region's fields.")
+
+    def test_headless_load_of_a_missing_id_reports_it(self):
+        MISSING_ID = 999999999
+
+        output = io.StringIO()
+
+        with contextlib.redirect_stdout(output):
+            status = cli.main(["load", str(DATABASE_PATH), "region", str(MISSING_ID)])
+
+        responses = [ json.loads(line) for line in output.getvalue().splitlines() ]
+
+        self.assertEqual(status, 0, "Failed to run the load.")
+        self.assertEqual(responses[-1]["event"], "RegionsLoadedEvent",
+                         "Failed to load the region by a batch load.")
+        self.assertEqual(responses[-1]["not_found_ids"], [ MISSING_ID ],
+                         "Failed to report the missing region.")
+
+    def test_headless_entry_point_never_imports_tkinter(self):
+        package_directory = pathlib.Path(cli.__file__).parent.parent
+
+        result = subprocess.run(
+            [sys.executable, "-c", "import sys, p2app.cli; print('tkinter' in sys.modules)"],
+            capture_output = True, text = True,
+            env = os.environ | { "PYTHONPATH": str(package_directory) })
+
+        self.assertEqual(result.stdout.strip(), "False", "Imported tkinter.")
+
+    def test_engine_imports_without_optional_modules(self):
+        DEFERRED_MODULES = [ "asyncio", "csv", "json", "tkinter" ]
+
+        package_directory = pathlib.Path(cli.__file__).parent.parent
+        environment = os.environ | { "PYTHONPATH": str(package_directory) }
+
+        loaded = subprocess.run(
+            [ sys.executable, "-c", "import sys, p2app.engine; "
+              f"print([ name for name in { DEFERRED_MODULES } if name in sys.modules ])" ],
+            capture_output = True, text = True, env = environment)
+
+        self.assertEqual(loaded.stdout.strip(), "[]", "Imported modules the engine doesn't need.")
+
+    def test_deferred_engines_are_imported_on_first_use(self):
+        self.assertIs(engine.ThreadedEngine, threaded.ThreadedEngine,
+                      "Failed to import the threaded engine.")
+        self.assertIs(engine.AsyncEngine, async_engine.AsyncEngine,
+                      "Failed to import the asynchronous engine.")
+
+        with self.assertRaises(AttributeError):
+            engine.NoSuchEngine
+
+    def test_events_are_routed_only_to_their_subscribers(self):
+        class Recorder(event_handling.EventHandler):
+            def __init__(self, name, handled_events, calls):
+                self._name = name
+                self.HANDLED_EVENTS = handled_events
+                self._calls = calls
+
+            def on_event(self, event):
+                self._calls.append((self._name, 'on_event'))
+
+            def on_event_post(self, event):
+                self._calls.append((self._name, 'on_event_post'))
+
+        calls = []
+        routes = event_handling.EventRoutes()
+        outer = Recorder('outer', (events.RegionSavedEvent, events.ErrorEvent), calls)
+        inner = Recorder('inner', (events.RegionSavedEvent,), calls)
+        unrelated = Recorder('unrelated', (events.CountrySavedEvent,), calls)
+
+        for handler in (outer, inner, unrelated):
+            routes.subscribe(handler)
+
+        routes.route(events.RegionSavedEvent(None))
+
+        self.assertEqual(calls, [('outer', 'on_event'), ('inner', 'on_event'),
+                                 ('inner', 'on_event_post'), ('outer', 'on_event_post')],
+                         "Failed to route the event to its subscribers, outermost first.")
+
+        calls.clear()
+        routes.unsubscribe(outer)
+        routes.route(events.ErrorEvent("failed"))
+
+        self.assertEqual(calls, [], "Routed an event to an unsubscribed handler.")
+
+    def test_routing_is_faster_than_broadcasting_to_every_widget(self):
+        WIDGET_COUNT = 300
+        EVENT_COUNT = 1000
+
+        try:
+            root = tkinter.Tk()
+        except tkinter.TclError:
+            self.skipTest("No display is available.")
+
+        class Handler(tkinter.Frame, event_handling.EventHandler):
+            pass
+
+        try:
+            routes = event_handling.EventRoutes()
+            handlers = [ Handler(root) for _ in range(WIDGET_COUNT) ]
+            handlers[0].HANDLED_EVENTS = (events.RegionSearchResultEvent,)
+            routes.subscribe(handlers[0])
+
+            result = events.RegionSearchResultEvent(None)
+
+            started = time.perf_counter()
+
+            for _ in range(EVENT_COUNT):
+                event_handling.EventHandler.handle_event(root, result)
+
+            broadcast_seconds = time.perf_counter() - started
+            started = time.perf_counter()
+
+            for _ in range(EVENT_COUNT):
+                routes.route(result)
+
+            routed_seconds = time.perf_counter() - started
+        finally:
+            root.destroy()
+
+        self.assertLess(routed_seconds * 10, broadcast_seconds,
+                        "Routing wasn't much faster than broadcasting.")
+
+    def test_virtual_list_only_draws_visible_rows(self):
+        ROW_COUNT = 100000
+
+        try:
+            root = tkinter.Tk()
+        except tkinter.TclError:
+            self.skipTest("No display is available.")
+
+        requests = []
+
+        try:
+            search_list = virtual_list.VirtualList(root, height = 4, on_fetch_page = requests.append)
+            rows = events.SearchResultColumns()
+
+            for i in range(ROW_COUNT):
+                rows.append(i, "row", str(i))
+
+            search_list.extend(rows)
+            search_list.complete_page(ROW_COUNT - 1)
+
+            drawn_at_top = search_list._listbox.size()
+            search_list._on_scrollbar(tkinter.MOVETO, "1.0")
+            drawn_at_end = search_list._listbox.get(0, tkinter.END)
+        finally:
+            root.destroy()
+
+        self.assertLess(drawn_at_top, 10, "Drew rows that aren't visible.")
+        self.assertEqual(drawn_at_end[-1], f"row - { ROW_COUNT - 1 }", "Failed to scroll to the end.")
+        self.assertEqual(requests, [ ROW_COUNT - 1 ], "Failed to ask for more rows only once.")
+
+    def test_virtual_list_refetches_pages_it_dropped(self):
+        PAGE_SIZE = 100
+        ROW_COUNT = 1000
+
+        try:
+            root = tkinter.Tk()
+        except tkinter.TclError:
+            self.skipTest("No display is available.")
+
+        requests = []
+
+        def send_page(search_list, after_id):
+            first = 0 if after_id is None else after_id + 1
+            last = min(first + PAGE_SIZE, ROW_COUNT)
+            rows = events.SearchResultColumns()
+
+            for i in range(first, last):
+                rows.append(i, "row", str(i))
+
+            search_list.extend(rows)
+            search_list.complete_page(last - 1 if last < ROW_COUNT else None)
+
+        try:
+            search_list = virtual_list.VirtualList(root, height = 4, on_fetch_page = requests.append)
+            send_page(search_list, None)
+
+            while search_list.row_count() < ROW_COUNT:
+                search_list._on_scrollbar(tkinter.MOVETO, "1.0")
+                send_page(search_list, requests[-1])
+
+            kept_pages = len(search_list._pages)
+            fetched_pages = len(requests)
+
+            search_list._on_scrollbar(tkinter.MOVETO, "0.0")
+            refetched_after_id = requests[-1]
+            send_page(search_list, refetched_after_id)
+            drawn_at_top = search_list._listbox.get(0)
+        finally:
+            root.destroy()
+
+        self.assertLessEqual(kept_pages, virtual_list._MAX_KEPT_PAGES, "Kept every page.")
+        self.assertEqual(len(requests), fetched_pages + 1, "Failed to ask for a dropped page.")
+        self.assertIsNone(refetched_after_id, "Asked for the wrong page.")
+        self.assertEqual(drawn_at_top, "row - 0", "Failed to draw the page it asked for again.")
+
+    def test_search_regions_into_columns(self):
+        REGION_1_ID = 303322
+        REGION_2_ID = 303335
+
+        for _ in self._engine._handle_open_database(events.OpenDatabaseEvent(DATABASE_PATH)):
+            pass
+        response = list(self._engine._handle_search_regions(
+            events.StartRegionSearchEvent("", "", "Ouham", batch_size = 500, is_columnar = True)))
+
+        self.assertEqual([ type(event) for event in response ],
+                         [ events.RegionSearchResultColumnsEvent ],
+                         "Failed to yield exactly one batch of columns.")
+
+        columns = response[0].columns()
+
+        self.assertEqual(list(columns.result_ids()), [ REGION_1_ID, REGION_2_ID ],
+                         "Failed to copy the ids of both regions.")
+        self.assertEqual([ (columns.code(i), columns.name(i)) for i in range(len(columns)) ],
+                         [ ("CF-AC", "Ouham"), ("CF-OP", "Ouham-Pendé") ],
+                         "Failed to copy the codes and names of both regions.")
+
+    def test_columns_hold_results_in_less_memory_than_records(self):
+        # without a search cache, both searches build their results from fresh rows
+        uncached_engine = engine.Engine(search_cache_budget = 0, compact_search_cache_budget = 0)
+
+        def measure(is_columnar):
+            tracemalloc.start()
+
+            try:
+                response = list(uncached_engine._handle_search_regions(
+                    events.StartRegionSearchEvent(
+                        None, None, None, batch_size = 500, is_columnar = is_columnar)))
+
+                # the views format each record into the text they show for it, too
+                if not is_columnar:
+                    texts = [ f'{ region.region_code } - { region.name }'
+                              for event in response for region in event.regions() ]
+
+                size, _ = tracemalloc.get_traced_memory()
+                allocations = sum(
+                    statistic.count
+                    for statistic in tracemalloc.take_snapshot().statistics('filename'))
+            finally:
+                tracemalloc.stop()
+
+            return size / row_count, allocations / row_count
+
+        try:
+            for _ in uncached_engine._handle_open_database(events.OpenDatabaseEvent(DATABASE_PATH)):
+                pass
+
+            row_count, = uncached_engine._connection.execute(
+                "SELECT COUNT(*) FROM region").fetchone()
+
+            record_bytes, record_allocations = measure(False)
+            column_bytes, column_allocations = measure(True)
+        finally:
+            uncached_engine.close()
+
+        self.assertLess(column_bytes, record_bytes / 2, "Failed to halve the bytes per result.")
+        self.assertLess(column_allocations, record_allocations / 2,
+                        "Failed to halve the allocations per result.")
+
+    def test_listing_searches_are_read_from_covering_indexes(self):
+        for _ in self._engine._handle_open_database(events.OpenDatabaseEvent(DATABASE_PATH)):
+            pass
+
+        # exact region codes are unique, so they're found with the unique index instead
+        for filters in [ {}, { "local_code": "AC" }, { "name": "ouham" } ]:
+            query, parameters = queries.build_search("region", filters, False, is_listing = True)
+            cursor = self._engine._connection.execute(f"EXPLAIN QUERY PLAN { query }", parameters)
+            plan = " ".join(detail for _, _, _, detail in cursor)
+            cursor.close()
+
+            self.assertIn("USING COVERING INDEX", plan,
+                          f"Failed to list regions found by { filters } from an index.")
+
+    def test_full_text_listings_look_up_each_match_by_id(self):
+        for _ in self._engine._handle_open_database(events.OpenDatabaseEvent(DATABASE_PATH)):
+            pass
+
+        query, parameters = queries.build_search("region", { "name": "ouham" }, True,
+                                                 is_listing = True)
+        cursor = self._engine._connection.execute(f"EXPLAIN QUERY PLAN { query }", parameters)
+        plan = " ".join(detail for _, _, _, detail in cursor)
+        cursor.close()
+
+        self.assertIn("region_fts", plan, "Failed to find the names with the full-text index.")
+        self.assertIn("SEARCH region USING INTEGER PRIMARY KEY", plan,
+                      "Failed to look up each match by its id.")
+        self.assertNotIn("SCAN region ", plan, "Scanned the whole table.")
+
+    def test_columnar_search_selects_only_listing_columns(self):
+        statements = []
+
+        for _ in self._engine._handle_open_database(events.OpenDatabaseEvent(DATABASE_PATH)):
+            pass
+
+        self._engine._connection.set_trace_callback(statements.append)
+
+        try:
+            response = list(self._engine._handle_search_regions(events.StartRegionSearchEvent(
+                "CF-AC", None, None, batch_size = 500, is_columnar = True)))
+        finally:
+            self._engine._connection.set_trace_callback(None)
+
+        self.assertEqual(response[0].columns().name(0), "Ouham", "Failed to find the region.")
+        self.assertTrue(any(statement.startswith(
+                            "SELECT region_id, region_code, local_code, name FROM region")
+                            for statement in statements),
+                        "Failed to select only the listing columns.")
+
+    def test_load_many_regions_in_request_order(self):
+        REGION_1_ID = 303322
+        REGION_2_ID = 303335
+        MISSING_ID = 999999999
+
+        for _ in self._engine._handle_open_database(events.OpenDatabaseEvent(DATABASE_PATH)):
+            pass
+        response = list(self._engine.process_event(
+            events.LoadRegionsEvent([ REGION_2_ID, MISSING_ID, REGION_1_ID ])))
+
+        self.assertEqual(type(response[0]), events.RegionsLoadedEvent,
+                         "Failed to load the regions.")
+        self.assertEqual([ region.name for region in response[0].regions() ],
+                         [ "Ouham-Pendé", "Ouham" ], "Failed to load the regions in order.")
+        self.assertEqual(response[0].not_found_ids(), (MISSING_ID,),
+                         "Failed to report the missing region.")
+
+    def test_load_many_regions_with_one_joined_query(self):
+        MISSING_ID = 999999999
+
+        uncached_engine = engine.Engine(record_cache_size = 1)
+        statements = []
+
+        try:
+            for _ in uncached_engine._handle_open_database(events.OpenDatabaseEvent(DATABASE_PATH)):
+                pass
+
+            region_ids = [ region_id for region_id, in uncached_engine._connection.execute(
+                "SELECT region_id FROM region ORDER BY region_id DESC") ]
+
+            uncached_engine._connection.set_trace_callback(statements.append)
+            response = list(uncached_engine.process_event(
+                events.LoadRegionsEvent(region_ids + [ MISSING_ID ])))
+            uncached_engine._connection.set_trace_callback(None)
+
+            is_in_transaction = uncached_engine._connection.in_transaction
+        finally:
+            uncached_engine.close()
+
+        selects = [ statement for statement in statements if statement.startswith("SELECT") ]
+
+        self.assertGreater(len(region_ids), 500, "Failed to load more ids than can be listed.")
+        self.assertEqual([ region.region_id for region in response[0].regions() ], region_ids,
+                         "Failed to load every region in order.")
+        self.assertEqual(response[0].not_found_ids(), (MISSING_ID,),
+                         "Failed to report the missing region.")
+        self.assertEqual(len(selects), 1, "Failed to load the regions with a single query.")
+        self.assertIn("JOIN region", selects[0], "Failed to join with a table of ids.")
+        self.assertFalse(is_in_transaction, "Left a transaction open.")
+
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file